@@ -0,0 +1,231 @@
+import hashlib
+import json
+import os
+import struct
+import zlib
+from datetime import datetime
+from operator import itemgetter
+
+from task_store import json_default
+
+BACKUP_MAGIC = b"EMPRESSBAK\x00\x02\n"
+BACKUP_VERSION = 2
+
+SEGMENT_SPAN = 1024  # Task ids per segment; old ids rarely change, so old segments repeat
+
+SEGMENT = b'S'
+MANIFEST = b'M'
+RECORD_HEADER = struct.Struct('>cI')  # Record kind and payload size
+DIGEST_SIZE = hashlib.sha256().digest_size
+
+
+class BackupError(Exception):
+    """A backup file that cannot be read or fails verification"""
+
+
+class BackupFile:
+    """An .empressbak file: compressed, content-hashed task segments plus one manifest per backup
+
+    Every backup appends only the segments not already in the file and a manifest
+    listing the segments it consists of, so each earlier backup can still be restored.
+    Version 1 files, one indented JSON document, can be restored as well.
+    """
+
+    def __init__(self, path):
+        self.path = path
+
+    # ==============================================
+    # Reading
+    # ==============================================
+
+    def can_append(self):
+        """Check whether a backup can be added without replacing the file: it is missing, empty or version 2"""
+        if not os.path.exists(self.path) or not os.path.getsize(self.path):
+            return True
+        with open(self.path, 'rb') as f:
+            return f.read(len(BACKUP_MAGIC)) == BACKUP_MAGIC
+
+    def is_legacy(self):
+        """Check for a version 1 backup, a single JSON document"""
+        with open(self.path, 'rb') as f:
+            return f.read(len(BACKUP_MAGIC)) != BACKUP_MAGIC
+
+    def scan(self):
+        """Get segment digest -> payload position, the manifest positions and the valid size
+
+        Only the record headers and digests are read. A record torn by a crash ends the scan.
+        """
+        segments, manifests = {}, []
+        size = os.path.getsize(self.path)
+        with open(self.path, 'rb') as f:
+            if f.read(len(BACKUP_MAGIC)) != BACKUP_MAGIC:
+                raise BackupError("Not a version 2 backup file")
+            valid_size = f.tell()
+
+            while valid_size + RECORD_HEADER.size <= size:
+                kind, length = RECORD_HEADER.unpack(f.read(RECORD_HEADER.size))
+                position = f.tell()
+                if kind not in (SEGMENT, MANIFEST) or length < DIGEST_SIZE or position + length > size:
+                    break
+                if kind == SEGMENT:
+                    segments[f.read(DIGEST_SIZE)] = (position, length)
+                else:
+                    manifests.append((position, length))
+                valid_size = position + length
+                f.seek(valid_size)
+
+        return segments, manifests, valid_size
+
+    @staticmethod
+    def read_payload(f, position, length):
+        """Read, verify and decode a record payload"""
+        f.seek(position)
+        payload = f.read(length)
+        digest, compressed = payload[:DIGEST_SIZE], payload[DIGEST_SIZE:]
+        try:
+            data = zlib.decompress(compressed)
+        except zlib.error:
+            raise BackupError(f"Corrupt record at byte {position}")
+        if hashlib.sha256(data).digest() != digest:
+            raise BackupError(f"Checksum mismatch in record at byte {position}")
+        return json.loads(data)
+
+    def points(self):
+        """Get the manifest of every backup in the file, oldest first, without their segments"""
+        if self.is_legacy():
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            created_at = datetime.fromtimestamp(os.path.getmtime(self.path))
+            return [{'created_at': created_at.strftime("%Y-%m-%d %H:%M:%S"),
+                     'count': len(data.get('tasks', [])), 'version': data.get('version', 1)}]
+
+        _, manifests, _ = self.scan()
+        with open(self.path, 'rb') as f:
+            return [self.read_payload(f, *manifest) for manifest in manifests]
+
+    def restore(self, point=-1):
+        """Get the data saved by one backup, the latest by default, verifying every segment"""
+        if self.is_legacy():
+            with open(self.path, 'r') as f:
+                data = json.load(f)
+            if not isinstance(data, dict) or not isinstance(data.get('tasks'), list):
+                raise BackupError("Invalid backup file")
+            return data
+
+        segments, manifests, _ = self.scan()
+        if not manifests:
+            raise BackupError("The backup file contains no complete backup")
+
+        with open(self.path, 'rb') as f:
+            manifest = self.read_payload(f, *manifests[point])
+            tasks = []
+            for digest in manifest['segments']:
+                position = segments.get(bytes.fromhex(digest))
+                if position is None:
+                    raise BackupError(f"Segment {digest[:12]} is missing")
+                tasks.extend(self.read_payload(f, *position))
+
+        if len(tasks) != manifest['count']:
+            raise BackupError("The backup does not contain the expected number of tasks")
+        return dict(manifest['settings'], tasks=tasks, next_id=manifest['next_id'])
+
+    def verify(self):
+        """Check every record and every backup's segments; get a list of problems found"""
+        if self.is_legacy():
+            try:
+                self.restore()
+            except (ValueError, BackupError) as e:
+                return [str(e)]
+            return []
+
+        problems = []
+        segments, manifests, valid_size = self.scan()
+        if valid_size != os.path.getsize(self.path):
+            problems.append(f"Incomplete data after byte {valid_size}")
+
+        with open(self.path, 'rb') as f:
+            for position in segments.values():
+                try:
+                    self.read_payload(f, *position)
+                except BackupError as e:
+                    problems.append(str(e))
+            for number, position in enumerate(manifests, 1):
+                try:
+                    manifest = self.read_payload(f, *position)
+                except BackupError as e:
+                    problems.append(str(e))
+                    continue
+                missing = [d for d in manifest['segments'] if bytes.fromhex(d) not in segments]
+                if missing:
+                    problems.append(f"Backup {number} is missing {len(missing)} segments")
+        return problems
+
+    # ==============================================
+    # Writing
+    # ==============================================
+
+    @staticmethod
+    def encode(data):
+        """Get the digest and compressed form of a JSON record"""
+        raw = json.dumps(data, sort_keys=True, separators=(',', ':'),
+                         default=json_default).encode('utf-8')
+        return hashlib.sha256(raw).digest(), zlib.compress(raw, 6)
+
+    def write(self, tasks, next_id, settings, replace=False):
+        """Append a backup of the tasks, writing only segments the file does not have yet
+
+        The tasks must not change while this runs; pass a TaskStore.snapshot().
+        A file that is not a version 2 backup, e.g. a version 1 one, is only replaced
+        when replace is true. Returns the number of segments written and the number reused.
+        """
+        existing, valid_size = {}, 0
+        if not self.can_append():
+            if not replace:
+                raise BackupError("The file is not a version 2 backup file")
+        elif os.path.exists(self.path) and os.path.getsize(self.path):
+            existing, _, valid_size = self.scan()
+
+        # Segment by id range, so unchanged old tasks keep producing identical segments
+        chunks = {}
+        for task in sorted(tasks, key=itemgetter('id')):
+            chunks.setdefault(task['id'] // SEGMENT_SPAN, []).append(task)
+
+        records, digests, reused = [], [], 0
+        for _, chunk in sorted(chunks.items()):
+            digest, compressed = self.encode(chunk)
+            digests.append(digest.hex())
+            if digest in existing:
+                reused += 1
+                continue
+            records.append(RECORD_HEADER.pack(SEGMENT, DIGEST_SIZE + len(compressed)) +
+                           digest + compressed)
+
+        manifest = {
+            'version': BACKUP_VERSION,
+            'created_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+            'count': len(tasks),
+            'next_id': next_id,
+            'settings': settings,
+            'segments': digests
+        }
+        digest, compressed = self.encode(manifest)
+        records.append(RECORD_HEADER.pack(MANIFEST, DIGEST_SIZE + len(compressed)) +
+                       digest + compressed)
+
+        if valid_size:
+            with open(self.path, 'r+b') as f:
+                # Drop a backup torn by a crash before appending the new one
+                f.truncate(valid_size)
+                f.seek(valid_size)
+                f.write(b''.join(records))
+                f.flush()
+                os.fsync(f.fileno())
+        else:
+            temp_path = self.path + '.tmp'
+            with open(temp_path, 'wb') as f:
+                f.write(BACKUP_MAGIC + b''.join(records))
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(temp_path, self.path)
+
+        return len(records) - 1, reused
@@ -0,0 +1,54 @@
+"""Deterministic synthetic task data for the benchmarks"""
+import random
+from datetime import datetime, timedelta
+
+PRIORITY_WEIGHTS = {'🔥 Critical': 5, '⚠️ High': 20, '🔼 Medium': 45, '🔽 Low': 20, '🌱 Chill': 10}
+CATEGORY_WEIGHTS = {'💼 Work': 40, '🏠 Personal': 20, '🎓 Study': 12, '❤️ Health': 10,
+                    '🛒 Shopping': 10, '🎉 Fun': 8}
+
+WORDS = ("report review meeting call email plan draft budget invoice design fix update "
+         "deploy test write read book order pay clean cook gym run doctor dentist groceries "
+         "birthday gift party trip flight hotel car insurance taxes garden paint laundry "
+         "project client team sprint release backup server database notes slides").split()
+
+# Fixed reference day, so every run generates exactly the same data
+TODAY = datetime(2024, 6, 1, 9, 0)
+
+
+def generate_tasks(count, seed=0, today=TODAY):
+    """Generate task dicts in the JSON data file schema
+
+    Due dates cluster around today: most overdue tasks are done, most future ones open.
+    """
+    rng = random.Random(seed)
+    priorities, priority_weights = zip(*PRIORITY_WEIGHTS.items())
+    categories, category_weights = zip(*CATEGORY_WEIGHTS.items())
+
+    tasks = []
+    for task_id in range(1, count + 1):
+        created = today - timedelta(minutes=rng.randint(0, 3 * 365 * 24 * 60))
+        due_date = None
+        completed = rng.random() < 0.3
+        if rng.random() < 0.7:
+            due = created + timedelta(days=int(rng.expovariate(1 / 30)))
+            due_date = due.strftime("%Y-%m-%d")
+            completed = rng.random() < (0.85 if due < today else 0.15)
+
+        completed_at = None
+        if completed:
+            completed_at = min(today, created + timedelta(hours=rng.randint(1, 24 * 60)))
+            completed_at = completed_at.strftime("%Y-%m-%d %H:%M")
+
+        tasks.append({
+            'id': task_id,
+            'title': ' '.join(rng.choices(WORDS, k=rng.randint(2, 6))).capitalize(),
+            'description': ' '.join(rng.choices(WORDS, k=rng.randint(0, 20))),
+            'due_date': due_date,
+            'priority': rng.choices(priorities, priority_weights)[0],
+            'category': rng.choices(categories, category_weights)[0],
+            'completed': completed,
+            'created_at': created.strftime("%Y-%m-%d %H:%M"),
+            'completed_at': completed_at,
+            'status': 'done' if completed else rng.choice(['todo', 'todo', 'in_progress'])
+        })
+    return tasks
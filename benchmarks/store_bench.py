@@ -0,0 +1,287 @@
+"""Time the store operations behind the app's views on generated data
+
+    python benchmarks/store_bench.py [--sizes 1000,10000,100000,1000000] [--output FILE]
+    python benchmarks/store_bench.py --compare BASELINE.json RESULTS.json [--threshold 0.15]
+
+Every operation runs against a store with the indexes the app builds and the chosen
+storage attached, so edits include the storage's cost per change. Results list the
+throughput, latency percentiles and the peak memory of one extra traced run.
+"""
+import argparse
+import gc
+import json
+import os
+import platform
+import random
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dataset import TODAY, WORDS, generate_tasks
+from storage import JsonStorage, JournalStorage, SQLiteStorage
+from task_store import DEFAULT_CATEGORIES, DEFAULT_PRIORITIES
+from todo_app import UltimateTodoApp
+
+DEFAULT_SIZES = (1000, 10000, 100000, 1000000)
+
+# Latency percentiles reported for every benchmark
+PERCENTILES = (50, 90, 99)
+
+
+# ==============================================
+# Measuring
+# ==============================================
+
+def percentile(ordered, share):
+    """Get a percentile of sorted values by linear interpolation"""
+    if len(ordered) == 1:
+        return ordered[0]
+    position = (len(ordered) - 1) * share / 100
+    low = int(position)
+    high = min(low + 1, len(ordered) - 1)
+    return ordered[low] + (ordered[high] - ordered[low]) * (position - low)
+
+
+def measure(call, args, trace_memory=True):
+    """Time call(arg) for every arg but the last, which runs once more under tracemalloc
+
+    Returns the summary stored in the results file; times are in milliseconds.
+    """
+    samples = []
+    gc.collect()
+    for arg in args[:-1]:
+        start = time.perf_counter()
+        call(arg)
+        samples.append(time.perf_counter() - start)
+
+    peak = None
+    if trace_memory:
+        gc.collect()
+        tracemalloc.start()
+        call(args[-1])
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+    samples.sort()
+    total = sum(samples)
+    summary = {
+        'runs': len(samples),
+        'ops_per_s': len(samples) / total if total else None,
+        'mean_ms': total / len(samples) * 1000,
+        'max_ms': samples[-1] * 1000,
+        'peak_memory_kb': None if peak is None else round(peak / 1024, 1)
+    }
+    for share in PERCENTILES:
+        summary[f'p{share}_ms'] = percentile(samples, share) * 1000
+    return summary
+
+
+# ==============================================
+# The app's storage and list view
+# ==============================================
+
+# The list view's default order: open tasks first, then by priority, due date and id
+list_order, _ = UltimateTodoApp.list_order_key('default', DEFAULT_PRIORITIES, DEFAULT_CATEGORIES)
+
+
+def open_storage(backend, directory):
+    """Create the app's storage for a backend, keeping its files in a directory"""
+    json_path = os.path.join(directory, 'tasks.json')
+    if backend == 'sqlite':
+        return SQLiteStorage(os.path.join(directory, 'tasks.db'), json_path)
+    if backend == 'snapshot':
+        return JsonStorage(json_path)
+    return JournalStorage(json_path)
+
+
+def saved_data(store):
+    """Get what the app hands to storage when saving"""
+    return {
+        'tasks': store.snapshot(),
+        'next_id': store.next_id,
+        'categories': list(DEFAULT_CATEGORIES),
+        'priorities': list(DEFAULT_PRIORITIES),
+        'colors': {}
+    }
+
+
+def filter_queries(today):
+    """Get the sidebar's list view filters as queries, by name"""
+    def sidebar(group, value):
+        return UltimateTodoApp.sidebar_query(group, value, today)
+
+    return {
+        'all': None,
+        'today': sidebar('due', 'today'),
+        'upcoming': sidebar('due', 'upcoming'),
+        'week': sidebar('due', 'week'),
+        'overdue': sidebar('due', 'overdue'),
+        'completed': sidebar('state', 'completed'),
+        'category': sidebar('category', DEFAULT_CATEGORIES[0]),
+        'priority': sidebar('priority', DEFAULT_PRIORITIES[0]),
+        # Like toggling a category and a priority on and Completed off
+        'combined': (sidebar('category', DEFAULT_CATEGORIES[0]) & sidebar('priority', DEFAULT_PRIORITIES[1])
+                     & sidebar('due', 'upcoming') & ~sidebar('state', 'completed')),
+    }
+
+
+# ==============================================
+# Benchmarks
+# ==============================================
+
+def run_size(count, args, directory):
+    """Run every benchmark on a store of count tasks; get name -> summary"""
+    rng = random.Random(count)
+    trace = not args.no_memory
+    results = {}
+    print(f"\n{count} tasks", flush=True)
+
+    def report(name, summary):
+        results[name] = summary
+        memory = summary['peak_memory_kb']
+        print(f"  {name:<20} p50 {summary['p50_ms']:>10.3f}ms  p99 {summary['p99_ms']:>10.3f}ms"
+              f"  {summary['ops_per_s'] or 0:>12.1f}/s"
+              + (f"  peak {memory / 1024:>8.1f}MB" if memory is not None else ""), flush=True)
+
+    # Start from a saved data file, like the app does
+    tasks = generate_tasks(count, seed=args.seed)
+    seed_storage = JsonStorage(os.path.join(directory, 'tasks.json'))
+    seed_storage.write_snapshot({'tasks': tasks, 'next_id': count + 1})
+    del tasks
+
+    storage = open_storage(args.storage, directory)
+    loaded = []
+
+    def load(_):
+        loaded[:] = UltimateTodoApp.build_store(storage.load())
+
+    report('load', measure(load, range(args.io_repeat + 1), trace))
+    store, (_, _, search_index, table, order) = loaded
+    storage.attach(store)
+
+    # Reading
+    for mode, query in filter_queries(TODAY.date()).items():
+        if query is None:
+            run_query = lambda _: list(store)
+        else:
+            run_query = lambda _: [store.get(task_id) for task_id in query.task_ids(table)]
+        report(f'filter:{mode}', measure(run_query, range(args.repeat + 1), trace))
+
+    queries = [' '.join(rng.sample(WORDS, rng.randint(1, 2))) for _ in range(args.samples + 1)]
+    report('search', measure(search_index.search, queries, trace))
+    # Search as you type: the first letters of a word match many tasks
+    prefixes = [rng.choice(WORDS)[:rng.randint(2, 3)] for _ in range(args.samples + 1)]
+    report('search:prefix', measure(search_index.search, prefixes, trace))
+    report('sort', measure(lambda _: sorted(store, key=list_order), range(args.repeat + 1), trace))
+    report('ordered', measure(lambda _: order.ordered(), range(args.repeat + 1), trace))
+
+    # Editing, a different task each time
+    ids = rng.sample(sorted(task['id'] for task in store), min(count, args.samples + 1))
+    report('edit', measure(lambda task_id: store.update(
+        task_id, title=f"Edited {task_id}", priority=rng.choice(DEFAULT_PRIORITIES)), ids, trace))
+
+    def toggle(task_id):
+        completed = not store.get(task_id)['completed']
+        store.update(task_id, completed=completed,
+                     completed_at=datetime.now().strftime("%Y-%m-%d %H:%M") if completed else None,
+                     status='done' if completed else 'todo')
+
+    report('toggle', measure(toggle, ids, trace))
+    report('add', measure(lambda i: store.add(
+        f"New task {i}", due_date=TODAY.strftime("%Y-%m-%d"), priority=rng.choice(DEFAULT_PRIORITIES),
+        category=rng.choice(DEFAULT_CATEGORIES)), range(args.samples + 1), trace))
+    report('delete', measure(store.remove, ids, trace))
+
+    # Saving writes what save_data hands to storage, on this thread
+    report('save', measure(lambda _: storage.save(saved_data(store)),
+                           range(args.io_repeat + 1), trace))
+    storage.close()
+    return results
+
+
+def run(args):
+    sizes = [int(size) for size in args.sizes.split(',')]
+    results = {
+        'created_at': datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'storage': args.storage,
+        'seed': args.seed,
+        'sizes': {}
+    }
+    for count in sizes:
+        directory = tempfile.mkdtemp(prefix='empress-bench-')
+        try:
+            results['sizes'][str(count)] = run_size(count, args, directory)
+        finally:
+            shutil.rmtree(directory, ignore_errors=True)
+
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nResults written to {args.output}")
+
+
+# ==============================================
+# Comparing
+# ==============================================
+
+def compare(baseline_path, results_path, threshold):
+    """Print the change of every median between two results files; True if none regressed"""
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+    with open(results_path) as f:
+        results = json.load(f)
+
+    for key in ('storage', 'python', 'platform'):
+        if baseline.get(key) != results.get(key):
+            print(f"Note: {key} differs: {baseline.get(key)} -> {results.get(key)}")
+
+    regressions = 0
+    print(f"{'tasks':>8} {'benchmark':<20} {'baseline':>11} {'now':>11} {'change':>8}")
+    for size, benchmarks in results['sizes'].items():
+        for name, summary in benchmarks.items():
+            before = baseline['sizes'].get(size, {}).get(name)
+            if before is None:
+                continue
+            change = summary['p50_ms'] / before['p50_ms'] - 1 if before['p50_ms'] else 0.0
+            slower = change > threshold
+            regressions += slower
+            print(f"{size:>8} {name:<20} {before['p50_ms']:>9.3f}ms {summary['p50_ms']:>9.3f}ms "
+                  f"{change:>+8.1%}{'  SLOWER' if slower else ''}")
+
+    print(f"\n{regressions} benchmarks more than {threshold:.0%} slower than the baseline")
+    return not regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--sizes', default=','.join(map(str, DEFAULT_SIZES)),
+                        help="comma separated task counts")
+    parser.add_argument('--storage', default=os.environ.get('EMPRESS_TODO_STORAGE', 'json'),
+                        choices=('json', 'snapshot', 'sqlite'))
+    parser.add_argument('--samples', type=int, default=500,
+                        help="tasks added, edited, toggled and deleted, and searches run")
+    parser.add_argument('--repeat', type=int, default=10, help="runs of each filter and sort")
+    parser.add_argument('--io-repeat', type=int, default=3, help="runs of save and load")
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--no-memory', action='store_true', help="skip the traced runs")
+    parser.add_argument('--output', '-o', help="write the results to a JSON file")
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'RESULTS'),
+                        help="compare two results files instead of running")
+    parser.add_argument('--threshold', type=float, default=0.15,
+                        help="slowdown of a median that counts as a regression")
+    args = parser.parse_args()
+
+    if args.compare:
+        sys.exit(0 if compare(*args.compare, args.threshold) else 1)
+    run(args)
+
+
+if __name__ == '__main__':
+    main()
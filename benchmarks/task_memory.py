@@ -0,0 +1,51 @@
+"""Compare the memory of tasks kept as JSON dicts and as Task records
+
+    python benchmarks/task_memory.py [COUNT ...]
+"""
+import gc
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dataset import generate_tasks
+from task_store import Task
+
+
+def measure(build):
+    """Get the memory still held by what build() returns, and how long it took"""
+    gc.collect()
+    tracemalloc.start()
+    start = time.perf_counter()
+    result = build()
+    elapsed = time.perf_counter() - start
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, current, elapsed
+
+
+def main(counts):
+    print(f"{'tasks':>9} {'dicts':>10} {'records':>10} {'saved':>6} {'load dicts':>11} {'load records':>13}")
+    for count in counts:
+        # Parsed from text like the data file, so every task has its own strings
+        text = json.dumps(generate_tasks(count))
+
+        dicts, dict_bytes, dict_time = measure(lambda: json.loads(text))
+        del dicts
+        records, record_bytes, record_time = measure(
+            lambda: [Task.from_dict(task) for task in json.loads(text)])
+
+        # Lossless: the records give back exactly the original JSON
+        assert json.dumps([task.to_dict() for task in records]) == text
+        del records
+
+        print(f"{count:>9} {dict_bytes / 2**20:>8.1f}MB {record_bytes / 2**20:>8.1f}MB "
+              f"{1 - record_bytes / dict_bytes:>6.0%} {dict_time:>10.2f}s {record_time:>12.2f}s")
+
+
+if __name__ == '__main__':
+    main([int(arg) for arg in sys.argv[1:]] or [1000, 10000, 100000])
@@ -0,0 +1,132 @@
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+
+TRACE_EVENT_LIMIT = 200000  # Most recent calls kept for the trace file
+HISTOGRAM_BUCKETS = 32      # Bucket n counts calls taking under 2**n microseconds
+
+
+class CallStats:
+    """Call count, total, last and slowest time, and a histogram of the call times"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0      # Nanoseconds, like the times below
+        self.last = 0
+        self.slowest = 0
+        self.buckets = [0] * HISTOGRAM_BUCKETS
+
+    def add(self, duration):
+        self.count += 1
+        self.total += duration
+        self.last = duration
+        self.slowest = max(self.slowest, duration)
+        self.buckets[min((duration // 1000).bit_length(), HISTOGRAM_BUCKETS - 1)] += 1
+
+    def percentile(self, share):
+        """Get an upper bound of a percentile of the call times from the histogram"""
+        wanted = self.count * share / 100
+        seen = 0
+        for bucket, calls in enumerate(self.buckets):
+            seen += calls
+            if calls and seen >= wanted:
+                return min(1000 << bucket, self.slowest)
+        return self.slowest
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'total_ms': self.total / 1e6,
+            'mean_ms': self.total / self.count / 1e6 if self.count else 0.0,
+            'p50_ms': self.percentile(50) / 1e6,
+            'p99_ms': self.percentile(99) / 1e6,
+            'slowest_ms': self.slowest / 1e6,
+            # Upper bound in microseconds -> calls
+            'histogram_us': {1 << bucket: calls for bucket, calls in enumerate(self.buckets) if calls}
+        }
+
+
+class Profiler:
+    """Times calls of instrumented functions and keeps them for a trace file
+
+    Functions are only wrapped when instrumented, so code that is never
+    instrumented runs exactly as before.
+    """
+
+    def __init__(self, trace_limit=TRACE_EVENT_LIMIT):
+        self.stats = {}     # Name -> CallStats
+        self.latest = {}    # Category -> (name, time) of the call that finished last
+        self.slowest_calls = {}  # Category -> (name, time) of the slowest call
+        self.events = deque(maxlen=trace_limit)  # (name, category, start, duration, thread id)
+        self.thread_names = {}
+        self.origin = time.perf_counter_ns()
+        self.lock = threading.Lock()  # Storage writes finish on worker threads
+
+    def wrap(self, name, function, category):
+        """Get a version of function that records each call under a name"""
+        @functools.wraps(function)
+        def timed(*args, **kwargs):
+            start = time.perf_counter_ns()
+            try:
+                return function(*args, **kwargs)
+            finally:
+                self.record(name, category, start, time.perf_counter_ns() - start)
+        return timed
+
+    def instrument(self, obj, names, category, prefix=''):
+        """Replace the named methods of an object with timed versions"""
+        for name in names:
+            setattr(obj, name, self.wrap(prefix + name, getattr(obj, name), category))
+
+    def record(self, name, category, start, duration):
+        thread = threading.current_thread()
+        with self.lock:
+            stats = self.stats.get(name)
+            if stats is None:
+                stats = self.stats[name] = CallStats()
+            stats.add(duration)
+            self.latest[category] = (name, duration)
+            if duration > self.slowest_calls.get(category, (None, -1))[1]:
+                self.slowest_calls[category] = (name, duration)
+            self.events.append((name, category, start, duration, thread.ident))
+            self.thread_names.setdefault(thread.ident, thread.name)
+
+    # ==============================================
+    # Reports
+    # ==============================================
+
+    def last_call(self, category):
+        """Get the name and time of the call of a category that finished last, or None"""
+        return self.latest.get(category)
+
+    def slowest(self, category):
+        """Get the name and time of the slowest call of a category so far, or None"""
+        return self.slowest_calls.get(category)
+
+    def summary(self):
+        """Get name -> statistics of every instrumented function called so far"""
+        with self.lock:
+            return {name: stats.to_dict() for name, stats in
+                    sorted(self.stats.items(), key=lambda item: -item[1].total)}
+
+    def write_trace(self, path):
+        """Write the recorded calls in the Trace Event Format read by chrome://tracing and Perfetto"""
+        with self.lock:
+            events, thread_names = list(self.events), dict(self.thread_names)
+        pid = os.getpid()
+
+        trace = [{'name': 'thread_name', 'ph': 'M', 'pid': pid, 'tid': tid, 'args': {'name': name}}
+                 for tid, name in thread_names.items()]
+        trace.extend({'name': name, 'cat': category, 'ph': 'X', 'pid': pid, 'tid': tid,
+                      'ts': (start - self.origin) / 1000, 'dur': duration / 1000}
+                     for name, category, start, duration, tid in events)
+
+        temp_path = path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump({'traceEvents': trace, 'displayTimeUnit': 'ms',
+                       'otherData': {'summary': self.summary()}}, f)
+        os.replace(temp_path, path)
+        return len(events)
@@ -0,0 +1,486 @@
+import json
+import os
+import sqlite3
+import threading
+
+from task_store import TASK_FIELDS, TaskChange, TaskStore, json_default
+
+DATA_FILE = "empress_todo_data.json"
+DATABASE_FILE = "empress_todo_data.db"
+
+# Everything except the tasks themselves
+SETTING_KEYS = ('next_id', 'categories', 'priorities', 'colors')
+
+
+class BackgroundWriter:
+    """Runs writes on a worker thread; a write waiting to start is replaced by a newer one"""
+
+    def __init__(self, write):
+        self.write = write
+        self.pending = None
+        self.busy = False
+        self.error = None
+        self.condition = threading.Condition()
+        self.thread = None
+
+    def submit(self, data):
+        """Queue data to be written, dropping any older data not written yet"""
+        with self.condition:
+            self.pending = data
+            self.condition.notify_all()
+            if self.thread is None:
+                self.thread = threading.Thread(target=self.run, daemon=True)
+                self.thread.start()
+
+    def run(self):
+        while True:
+            with self.condition:
+                while self.pending is None:
+                    self.condition.wait()
+                data, self.pending = self.pending, None
+                self.busy = True
+            try:
+                self.write(data)
+            except Exception as e:
+                self.error = e
+            finally:
+                with self.condition:
+                    self.busy = False
+                    self.condition.notify_all()
+
+    def is_idle(self):
+        with self.condition:
+            return self.pending is None and not self.busy
+
+    def take_error(self):
+        """Get and clear the error of a failed write, if any"""
+        with self.condition:
+            error, self.error = self.error, None
+        return error
+
+    def flush(self):
+        """Wait until everything submitted has been written"""
+        with self.condition:
+            while self.pending is not None or self.busy:
+                self.condition.wait()
+
+
+class JsonStorage:
+    """Whole-file storage: the tasks and settings in one JSON document"""
+
+    def __init__(self, path=DATA_FILE):
+        self.path = path
+        self.writer = BackgroundWriter(self.save)
+
+    def load(self):
+        """Load the saved data, or None if there is none"""
+        if not os.path.exists(self.path):
+            return None
+        with open(self.path, 'r') as f:
+            return json.load(f)
+
+    def attach(self, store):
+        """Follow store changes; whole-file storage only writes on save()"""
+
+    def save(self, data):
+        """Save the tasks and settings"""
+        self.write_snapshot(data, indent=2)
+
+    def write_snapshot(self, data, indent=None):
+        """Write the whole data file atomically, so a crash never leaves half a file"""
+        temp_path = self.path + '.tmp'
+        with open(temp_path, 'w') as f:
+            json.dump(data, f, indent=indent, separators=None if indent else (',', ':'),
+                      default=json_default)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temp_path, self.path)
+
+    def save_in_background(self, data):
+        """Save on a worker thread; data must not be mutated afterwards, see TaskStore.snapshot"""
+        self.writer.submit(data)
+
+    def is_saving(self):
+        return not self.writer.is_idle()
+
+    def take_error(self):
+        """Get the error of a failed background save, if any"""
+        return self.writer.take_error()
+
+    def close(self):
+        """Wait for a pending background save"""
+        self.writer.flush()
+
+
+class JournalStorage(JsonStorage):
+    """JSON snapshot plus an append-only journal of the changes made since"""
+
+    SYNC_EVERY = 64          # Journal records written before an fsync
+    SYNC_INTERVAL = 1.0      # Seconds before fewer records are fsynced anyway
+    COMPACT_BYTES = 1 << 20  # Journal size at which it is folded into a new snapshot
+
+    def __init__(self, path=DATA_FILE):
+        super().__init__(path)
+        self.journal_path = path + '.journal'
+        # Journal being folded into the snapshot by a background compaction
+        self.sealed_path = path + '.journal.sealed'
+
+        self.settings = {}
+        self.store = None
+        self.journal = None
+        self.journal_size = 0  # Bytes of whole records, anything after was torn
+        self.repaired = False  # Whether the loaded tasks had ids the store has to replace
+        self.loaded = False    # Set by a load that read the snapshot and both journals
+        self.unsynced = 0
+        self.lock = threading.Lock()
+        self.sync_timer = None
+        self.compactor = None
+
+    # ==============================================
+    # Loading
+    # ==============================================
+
+    def load(self):
+        """Load the last snapshot and replay the journal on top of it"""
+        data = super().load()
+        has_journal = any(os.path.exists(p) for p in (self.sealed_path, self.journal_path))
+        if data is None and not has_journal:
+            self.loaded = True
+            return None
+
+        data = data or {}
+        tasks, unindexed = {}, []
+        for task in data.get('tasks', []):
+            if isinstance(task.get('id'), int) and task['id'] not in tasks:
+                tasks[task['id']] = task
+            else:
+                unindexed.append(task)  # Left for the store to repair
+        highest_id = 0
+
+        for path in (self.sealed_path, self.journal_path):
+            records, self.journal_size = self.read_journal(path)
+            for record in records:
+                op = record.get('op')
+                if op == 'put':
+                    task = record['task']
+                    tasks[task['id']] = task
+                    highest_id = max(highest_id, task['id'])
+                elif op == 'del':
+                    tasks.pop(record['id'], None)
+                elif op == 'reset':
+                    tasks.clear()
+                    unindexed = []
+                elif op == 'settings':
+                    data.update(record['data'])
+
+        data['tasks'] = list(tasks.values()) + unindexed
+        self.repaired = bool(unindexed)
+        self.loaded = True
+        data['next_id'] = max(data.get('next_id') or 1, highest_id + 1)
+        self.settings = {key: data[key] for key in SETTING_KEYS if key in data}
+        return data
+
+    @staticmethod
+    def read_journal(path):
+        """Read journal records up to one torn by a crash; also return their size"""
+        records, size = [], 0
+        if not os.path.exists(path):
+            return records, size
+
+        with open(path, 'rb') as f:
+            for line in f:
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    records.append(json.loads(line))
+                except ValueError:
+                    break
+                size += len(line)
+        return records, size
+
+    # ==============================================
+    # Journaling
+    # ==============================================
+
+    def attach(self, store):
+        """Append every later store change to the journal
+
+        Only after a successful load: the journal is truncated to what the load read,
+        and compaction replaces the snapshot with the store.
+        """
+        if not self.loaded:
+            raise RuntimeError("The saved data must be loaded before changes are journaled")
+        self.store = store
+        if self.repaired:
+            # The ids the store gave tasks with duplicate ids are only in memory; save them
+            # before changes are journaled under them, or the next load repairs them again
+            self.write_snapshot(dict(self.settings, tasks=store.snapshot(), next_id=store.next_id))
+            for path in (self.sealed_path, self.journal_path):
+                if os.path.exists(path):
+                    os.remove(path)
+            self.journal_size = 0
+            self.repaired = False
+
+        self.journal = open(self.journal_path, 'a')
+        if self.journal.tell() > self.journal_size:
+            # Drop a torn last record, or records after it would never be replayed
+            self.journal.truncate(self.journal_size)
+            self.journal.seek(self.journal_size)
+        store.subscribe(self.on_store_changed)
+
+        # Finish a compaction interrupted by a crash, or one that is overdue
+        if os.path.exists(self.sealed_path) or self.journal.tell() > self.COMPACT_BYTES:
+            self.compact()
+
+    def on_store_changed(self, changes):
+        """Append one compact record per change"""
+        records = []
+        for change in changes:
+            if change.kind == TaskChange.RESET:
+                records.append({'op': 'reset'})
+                records.extend({'op': 'put', 'task': task} for task in self.store)
+            elif change.kind == TaskChange.REMOVED:
+                records.append({'op': 'del', 'id': change.task_id})
+            else:
+                records.append({'op': 'put', 'task': change.task})
+        self.append(records)
+
+    def append(self, records):
+        with self.lock:
+            self.journal.write(''.join(
+                json.dumps(record, separators=(',', ':'), default=json_default) + '\n'
+                for record in records))
+            self.unsynced += len(records)
+            size = self.journal.tell()
+            sync_now = self.unsynced >= self.SYNC_EVERY
+            # The timer clears sync_timer under the lock, so it is only checked under it
+            if not sync_now and self.sync_timer is None:
+                self.sync_timer = threading.Timer(self.SYNC_INTERVAL, self.sync)
+                self.sync_timer.daemon = True
+                self.sync_timer.start()
+
+        if sync_now:
+            self.sync()
+
+        if size > self.COMPACT_BYTES:
+            self.compact()
+
+    def sync(self):
+        """Make the journal records written so far durable"""
+        with self.lock:
+            if self.sync_timer is not None:
+                self.sync_timer.cancel()
+                self.sync_timer = None
+            if self.journal is None or not self.unsynced:
+                return
+            self.journal.flush()
+            os.fsync(self.journal.fileno())
+            self.unsynced = 0
+
+    def save(self, data):
+        """Journal the settings; the tasks are already journaled as they change"""
+        self.settings = {key: data[key] for key in SETTING_KEYS if key in data}
+        self.append([{'op': 'settings', 'data': self.settings}])
+        self.sync()
+
+    def save_in_background(self, data):
+        """Journal changed settings and leave the fsync to the sync timer"""
+        settings = {key: data[key] for key in SETTING_KEYS if key in data}
+        if settings != self.settings:
+            self.settings = settings
+            self.append([{'op': 'settings', 'data': settings}])
+
+    # ==============================================
+    # Compaction
+    # ==============================================
+
+    def compact(self):
+        """Fold the journal into a fresh snapshot on a background thread"""
+        if self.compactor is not None and self.compactor.is_alive():
+            return
+        if os.path.exists(self.sealed_path) and self.compactor is not None:
+            return  # The last compaction failed; keep its journal for the next load
+
+        self.sync()
+        with self.lock:
+            # New changes go to a fresh journal while the old one is folded in
+            self.journal.close()
+            if not os.path.exists(self.sealed_path):
+                os.replace(self.journal_path, self.sealed_path)
+            else:
+                self.append_file(self.journal_path, self.sealed_path)
+            self.journal = open(self.journal_path, 'a')
+
+        snapshot = dict(self.settings, tasks=self.store.snapshot(), next_id=self.store.next_id)
+        self.compactor = threading.Thread(target=self.write_compacted, args=(snapshot,),
+                                          daemon=True)
+        self.compactor.start()
+
+    def write_compacted(self, snapshot):
+        self.write_snapshot(snapshot)
+        os.remove(self.sealed_path)
+
+    @staticmethod
+    def append_file(source, target):
+        with open(source, 'r') as src, open(target, 'a') as dst:
+            dst.write(src.read())
+            dst.flush()
+            os.fsync(dst.fileno())
+        os.remove(source)
+
+    def close(self):
+        """Make the journal durable and wait for a running compaction"""
+        super().close()
+        self.sync()
+        if self.compactor is not None:
+            self.compactor.join()
+        if self.journal is not None:
+            self.journal.close()
+            self.journal = None
+
+
+class SQLiteStorage:
+    """Per-task storage in SQLite; every store change is written as it happens"""
+
+    def __init__(self, path=DATABASE_FILE, json_path=DATA_FILE):
+        self.path = path
+        self.json_path = json_path
+        # Loading may run on a worker thread; the connection is never used by two at once
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.create_schema()
+
+    def create_schema(self):
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS tasks (
+                    id INTEGER PRIMARY KEY,
+                    title TEXT NOT NULL,
+                    description TEXT,
+                    due_date TEXT,
+                    priority TEXT,
+                    category TEXT,
+                    completed INTEGER NOT NULL DEFAULT 0,
+                    created_at TEXT,
+                    completed_at TEXT,
+                    status TEXT,
+                    extra TEXT
+                )""")
+            for column in ('due_date', 'category', 'priority', 'status'):
+                self.conn.execute(
+                    f"CREATE INDEX IF NOT EXISTS tasks_{column} ON tasks ({column})")
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS settings (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                )""")
+
+    # ==============================================
+    # Loading
+    # ==============================================
+
+    def load(self):
+        """Load the saved data, migrating the JSON data file on first start"""
+        if self.is_empty() and self.json_path and os.path.exists(self.json_path):
+            self.migrate_json()
+
+        settings = {key: json.loads(value)
+                    for key, value in self.conn.execute("SELECT key, value FROM settings")}
+        tasks = [self.row_to_task(row) for row in self.conn.execute(
+            f"SELECT {', '.join(TASK_FIELDS)}, extra FROM tasks ORDER BY id")]
+
+        if not tasks and not settings:
+            return None
+        return dict(settings, tasks=tasks)
+
+    def is_empty(self):
+        return (self.conn.execute("SELECT 1 FROM tasks LIMIT 1").fetchone() is None and
+                self.conn.execute("SELECT 1 FROM settings LIMIT 1").fetchone() is None)
+
+    def migrate_json(self):
+        """Copy the JSON data file into the database in one transaction"""
+        with open(self.json_path, 'r') as f:
+            data = json.load(f)
+
+        # Going through a store repairs duplicate ids from old data files
+        store = TaskStore(data.get('tasks', []), data.get('next_id'))
+        data['next_id'] = store.next_id
+
+        with self.conn:
+            self.conn.executemany(self.upsert_sql(), (self.task_to_row(t) for t in store))
+            self.write_settings(data)
+
+    # ==============================================
+    # Writing
+    # ==============================================
+
+    def attach(self, store):
+        """Write every later store change to the database"""
+        self.store = store
+        store.subscribe(self.on_store_changed)
+
+    def on_store_changed(self, changes):
+        """Write a batch of changes as one transaction"""
+        with self.conn:
+            for change in changes:
+                if change.kind == TaskChange.RESET:
+                    self.conn.execute("DELETE FROM tasks")
+                    self.conn.executemany(self.upsert_sql(),
+                                          (self.task_to_row(t) for t in self.store))
+                elif change.kind == TaskChange.REMOVED:
+                    self.conn.execute("DELETE FROM tasks WHERE id = ?", (change.task_id,))
+                else:
+                    self.conn.execute(self.upsert_sql(), self.task_to_row(change.task))
+
+            self.conn.execute("INSERT OR REPLACE INTO settings VALUES ('next_id', ?)",
+                              (json.dumps(self.store.next_id),))
+
+    def save(self, data):
+        """Save the settings; the tasks are already written as they change"""
+        with self.conn:
+            self.write_settings(data)
+
+    def write_settings(self, data):
+        self.conn.executemany(
+            "INSERT OR REPLACE INTO settings VALUES (?, ?)",
+            [(key, json.dumps(data[key])) for key in SETTING_KEYS if key in data])
+
+    def save_in_background(self, data):
+        """Settings are a few rows, so they are written right away"""
+        self.save(data)
+
+    def is_saving(self):
+        return False
+
+    def take_error(self):
+        return None
+
+    def close(self):
+        self.conn.close()
+
+    # ==============================================
+    # Row Conversion
+    # ==============================================
+
+    @staticmethod
+    def upsert_sql():
+        columns = TASK_FIELDS + ('extra',)
+        return (f"INSERT OR REPLACE INTO tasks ({', '.join(columns)}) "
+                f"VALUES ({', '.join('?' * len(columns))})")
+
+    @staticmethod
+    def task_to_row(task):
+        # Fields outside the schema, e.g. from imported files, are kept as JSON
+        extra = {key: value for key, value in task.items() if key not in TASK_FIELDS}
+        row = [task.get(column) for column in TASK_FIELDS]
+        row[TASK_FIELDS.index('completed')] = int(bool(task.get('completed')))
+        return tuple(row) + (json.dumps(extra) if extra else None,)
+
+    @staticmethod
+    def row_to_task(row):
+        task = dict(zip(TASK_FIELDS, row))
+        task['completed'] = bool(task['completed'])
+        if row[-1]:
+            task.update(json.loads(row[-1]))
+        return task
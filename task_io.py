@@ -0,0 +1,280 @@
+import codecs
+import csv
+import json
+import os
+import re
+import threading
+from datetime import datetime
+
+from task_store import TIMESTAMP_FORMAT, TASK_FIELDS, TASK_STATUSES, json_default
+
+READ_CHUNK_SIZE = 1 << 16
+IMPORT_BATCH_SIZE = 500
+EXPORT_CHUNK_SIZE = 1000
+
+# File extension -> export format
+EXPORT_FORMATS = {'.ndjson': 'ndjson', '.jsonl': 'ndjson', '.csv': 'csv', '.json': 'json'}
+
+WHITESPACE = re.compile(r"\s*")
+DATE_PREFIX = re.compile(r"\d{4}-\d{2}-\d{2}")
+
+
+def iter_json_records(f, chunk_size=READ_CHUNK_SIZE):
+    """Yield (record, bytes read so far) from a JSON array or NDJSON file opened in binary mode
+
+    The file is decoded chunk by chunk, so memory use is bounded by the largest record.
+    """
+    decoder = json.JSONDecoder()
+    text = codecs.getincrementaldecoder('utf-8-sig')()
+    buffer, pos, bytes_read, eof = '', 0, 0, False
+
+    def read_more():
+        nonlocal buffer, pos, bytes_read, eof
+        chunk = f.read(chunk_size)
+        bytes_read += len(chunk)
+        eof = not chunk
+        buffer = buffer[pos:] + text.decode(chunk, final=eof)
+        pos = 0
+
+    def next_char():
+        """Skip whitespace and return the next character, or '' at the end of the file"""
+        nonlocal pos
+        while True:
+            pos = WHITESPACE.match(buffer, pos).end()
+            if pos < len(buffer) or eof:
+                return buffer[pos:pos + 1]
+            read_more()
+
+    # A top level array is read element by element, anything else as one value per line
+    in_array = next_char() == '['
+    if in_array:
+        pos += 1
+    first = True
+
+    while True:
+        char = next_char()
+        if in_array:
+            if char == ']':
+                return
+            if not first:
+                if char != ',':
+                    raise ValueError(f"Expected ',' or ']' after record, found {char!r}")
+                pos += 1
+                char = next_char()
+        if not char:
+            if in_array:
+                raise ValueError("Unexpected end of file inside the task array")
+            return
+
+        while True:
+            try:
+                record, end = decoder.raw_decode(buffer, pos)
+                # A value ending with the buffer may continue in the next chunk, e.g. a number
+                if end < len(buffer) or eof:
+                    break
+            except json.JSONDecodeError:
+                if eof:
+                    raise
+            read_more()
+
+        pos = end
+        first = False
+        yield record, bytes_read
+
+
+def normalize_task(task):
+    """Fill in and clean up an imported record in place; None if it is not a task"""
+    if not isinstance(task, dict):
+        return None
+    title = task.get('title')
+    if not isinstance(title, str) or not title.strip():
+        return None
+
+    task['title'] = title.strip()
+    task['description'] = str(task.get('description') or "")
+
+    due_date = task.get('due_date')
+    match = DATE_PREFIX.match(due_date) if isinstance(due_date, str) else None
+    task['due_date'] = match.group() if match else None
+
+    for field, default in (('priority', "🔼 Medium"), ('category', "💼 Work")):
+        if not isinstance(task.get(field), str) or not task[field]:
+            task[field] = default
+
+    task['completed'] = bool(task.get('completed'))
+    if not isinstance(task.get('created_at'), str):
+        task['created_at'] = datetime.now().strftime(TIMESTAMP_FORMAT)
+    if not task['completed'] or not isinstance(task.get('completed_at'), str):
+        task['completed_at'] = None
+    if task.get('status') not in TASK_STATUSES:
+        task['status'] = 'done' if task['completed'] else 'todo'
+    return task
+
+
+class TaskImporter:
+    """Imports a task file into a store one batch at a time, so a UI can stay responsive"""
+
+    def __init__(self, store, path, batch_size=IMPORT_BATCH_SIZE):
+        self.store = store
+        self.batch_size = batch_size
+        self.file = open(path, 'rb')
+        self.size = os.path.getsize(path)
+        self.records = iter_json_records(self.file)
+
+        self.bytes_read = 0
+        self.imported_ids = []
+        self.skipped = 0
+        self.done = False
+
+    @property
+    def progress(self):
+        """Fraction of the file read so far"""
+        return self.bytes_read / self.size if self.size else 1.0
+
+    def step(self):
+        """Import the next batch as one store change; return False once the file is done"""
+        batch = []
+        for record, self.bytes_read in self.records:
+            task = normalize_task(record)
+            if task is None:
+                self.skipped += 1
+                continue
+            batch.append(task)
+            if len(batch) >= self.batch_size:
+                break
+        else:
+            self.done = True
+            self.close()
+
+        if batch:
+            self.imported_ids.extend(task.id for task in self.store.insert_many(batch))
+        return not self.done
+
+    def run(self):
+        """Import the whole file at once"""
+        while self.step():
+            pass
+        return len(self.imported_ids)
+
+    def cancel(self):
+        """Stop importing and remove the tasks imported so far"""
+        self.close()
+        with self.store.batch():
+            for task_id in self.imported_ids:
+                self.store.remove(task_id)
+        self.imported_ids = []
+
+    def close(self):
+        self.file.close()
+
+
+def export_filter(category=None, due_from=None, due_to=None, predicate=None):
+    """Combine export criteria into one task predicate, or None to export everything"""
+    tests = []
+    if category:
+        tests.append(lambda t: t['category'] == category)
+    if due_from:
+        tests.append(lambda t: bool(t['due_date']) and t['due_date'] >= due_from)
+    if due_to:
+        tests.append(lambda t: bool(t['due_date']) and t['due_date'] <= due_to)
+    if predicate:
+        tests.append(predicate)
+    if not tests:
+        return None
+    return lambda t: all(test(t) for test in tests)
+
+
+class TaskExporter:
+    """Streams tasks to an NDJSON, CSV or compact JSON file on a worker thread
+
+    The tasks must not change while exporting; pass a TaskStore.snapshot().
+    """
+
+    def __init__(self, tasks, path, fmt=None, predicate=None, chunk_size=EXPORT_CHUNK_SIZE):
+        self.tasks = tasks
+        self.path = path
+        self.format = fmt or self.format_for(os.path.splitext(path)[1])
+        self.predicate = predicate
+        self.chunk_size = chunk_size
+
+        self.scanned = 0
+        self.written = 0
+        self.cancelled = False
+        self.error = None
+        self.thread = None
+
+    @staticmethod
+    def format_for(extension):
+        """Get the export format for a file extension; JSON if it is not known"""
+        return EXPORT_FORMATS.get(extension.lower(), 'json')
+
+    @property
+    def progress(self):
+        """Fraction of the tasks looked at so far"""
+        return self.scanned / len(self.tasks) if self.tasks else 1.0
+
+    @property
+    def done(self):
+        return self.thread is not None and not self.thread.is_alive()
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def cancel(self):
+        """Stop exporting; the target file is left untouched"""
+        self.cancelled = True
+
+    def chunks(self):
+        """Yield lists of the tasks to export"""
+        chunk = []
+        for self.scanned, task in enumerate(self.tasks, 1):
+            if self.predicate is None or self.predicate(task):
+                chunk.append(task)
+                if len(chunk) >= self.chunk_size:
+                    yield chunk
+                    chunk = []
+            if self.cancelled:
+                return
+        if chunk:
+            yield chunk
+
+    def run(self):
+        """Export everything, writing to a temporary file that replaces the target at the end"""
+        temp_path = self.path + '.tmp'
+        try:
+            with open(temp_path, 'w', encoding='utf-8', newline='') as f:
+                getattr(self, 'write_' + self.format)(f)
+            if self.cancelled:
+                os.remove(temp_path)
+            else:
+                os.replace(temp_path, self.path)
+        except Exception as e:
+            self.error = e
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+
+    def write_ndjson(self, f):
+        for chunk in self.chunks():
+            f.write(''.join(json.dumps(task, separators=(',', ':'), ensure_ascii=False,
+                                       default=json_default) + '\n' for task in chunk))
+            self.written += len(chunk)
+
+    def write_json(self, f):
+        f.write('[')
+        separator = '\n'
+        for chunk in self.chunks():
+            f.write(separator + ',\n'.join(
+                json.dumps(task, separators=(',', ':'), ensure_ascii=False, default=json_default)
+                for task in chunk))
+            separator = ',\n'
+            self.written += len(chunk)
+        f.write('\n]\n')
+
+    def write_csv(self, f):
+        # Fields outside the task schema have no column and are left out
+        writer = csv.DictWriter(f, fieldnames=TASK_FIELDS, extrasaction='ignore')
+        writer.writeheader()
+        for chunk in self.chunks():
+            writer.writerows(chunk)
+            self.written += len(chunk)
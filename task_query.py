@@ -0,0 +1,131 @@
+from task_store import day_number
+
+
+class Query:
+    """A task filter that a TaskTable answers with bitmaps and that can also test one task
+
+    Queries combine with & (and), | (or) and ~ (not), e.g.
+    Field('category', '💼 Work') & DueBetween(monday, sunday) & ~Field('completed', True)
+    """
+
+    def bitmap(self, table):
+        """Get the bitmap of the rows of the table's tasks that match"""
+        raise NotImplementedError
+
+    def matches(self, task):
+        """Check a single task, e.g. one that just changed"""
+        raise NotImplementedError
+
+    def task_ids(self, table):
+        """Get the ids of the matching tasks, in row order"""
+        return table.task_ids(self.bitmap(table))
+
+    def __and__(self, other):
+        return All(self, other)
+
+    def __or__(self, other):
+        return Any(self, other)
+
+    def __invert__(self):
+        return Not(self)
+
+
+class Field(Query):
+    """Tasks whose field has a value; the field is one of TaskTable.grouped"""
+
+    def __init__(self, field, value):
+        self.field = field
+        self.value = value
+
+    def bitmap(self, table):
+        return table.bitmap(self.field, self.value)
+
+    def matches(self, task):
+        if self.field == 'completed':
+            return bool(task['completed']) == bool(self.value)
+        return task[self.field] == self.value
+
+    def __str__(self):
+        if self.field == 'completed':
+            return 'completed' if self.value else 'open'
+        return str(self.value)
+
+
+class DueBetween(Query):
+    """Tasks due from start to end ('YYYY-MM-DD', inclusive); either end may be open"""
+
+    def __init__(self, start=None, end=None):
+        self.start = start
+        self.end = end
+        self.low = day_number(start) if start else None
+        self.high = day_number(end) if end else None
+
+    def bitmap(self, table):
+        return table.due_between(self.start, self.end)
+
+    def matches(self, task):
+        due_date = task['due_date']
+        days = day_number(due_date[:10]) if isinstance(due_date, str) else None
+        if days is None:
+            return False
+        return (self.low is None or days >= self.low) and (self.high is None or days <= self.high)
+
+    def __str__(self):
+        return f"due {self.start or '…'} to {self.end or '…'}"
+
+
+class All(Query):
+    """Tasks matching every part; with no parts, all tasks"""
+
+    def __init__(self, *parts):
+        self.parts = parts
+
+    def bitmap(self, table):
+        bitmap = table.live
+        for part in self.parts:
+            bitmap &= part.bitmap(table)
+            if not bitmap:
+                break
+        return bitmap
+
+    def matches(self, task):
+        return all(part.matches(task) for part in self.parts)
+
+    def __str__(self):
+        return ' and '.join(map(str, self.parts)) or 'all'
+
+
+class Any(Query):
+    """Tasks matching at least one part; with no parts, none"""
+
+    def __init__(self, *parts):
+        self.parts = parts
+
+    def bitmap(self, table):
+        bitmap = 0
+        for part in self.parts:
+            bitmap |= part.bitmap(table)
+        return bitmap
+
+    def matches(self, task):
+        return any(part.matches(task) for part in self.parts)
+
+    def __str__(self):
+        text = ' or '.join(map(str, self.parts)) or 'none'
+        return f"({text})" if len(self.parts) > 1 else text
+
+
+class Not(Query):
+    """Tasks not matching a query"""
+
+    def __init__(self, part):
+        self.part = part
+
+    def bitmap(self, table):
+        return table.live & ~self.part.bitmap(table)
+
+    def matches(self, task):
+        return not self.part.matches(task)
+
+    def __str__(self):
+        return f"not {self.part}"
@@ -0,0 +1,1031 @@
+from array import array
+from bisect import bisect_left, insort
+from collections import Counter
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from datetime import date, datetime
+from functools import lru_cache
+from operator import itemgetter
+import heapq
+import re
+import sys
+import threading
+
+DEFAULT_CATEGORIES = ['💼 Work', '🏠 Personal', '🎓 Study', '❤️ Health', '🛒 Shopping', '🎉 Fun']
+DEFAULT_PRIORITIES = ['🔥 Critical', '⚠️ High', '🔼 Medium', '🔽 Low', '🌱 Chill']
+TIMESTAMP_FORMAT = "%Y-%m-%d %H:%M"
+TASK_STATUSES = ('todo', 'in_progress', 'done')
+TASK_FIELDS = ('id', 'title', 'description', 'due_date', 'priority', 'category',
+               'completed', 'created_at', 'completed_at', 'status')
+
+WORD_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text):
+    """Split text into lowercase search words"""
+    return WORD_PATTERN.findall(text.lower()) if text else []
+
+
+# ==============================================
+# Task Records
+# ==============================================
+
+TIMESTAMP_PATTERN = re.compile(r"\d{4}-\d{2}-\d{2} ([01]\d|2[0-3]):[0-5]\d")
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+
+
+@lru_cache(maxsize=4096)
+def day_number(text):
+    """Get a 'YYYY-MM-DD' date as days since 1970, or None if it is not a valid date"""
+    try:
+        return date(int(text[0:4]), int(text[5:7]), int(text[8:10])).toordinal() - EPOCH_ORDINAL
+    except ValueError:
+        return None
+
+
+@lru_cache(maxsize=4096)
+def day_text(days):
+    """Get the 'YYYY-MM-DD ' prefix of a timestamp for days since 1970"""
+    day = date.fromordinal(days + EPOCH_ORDINAL)
+    return f"{day.year:04d}-{day.month:02d}-{day.day:02d} "
+
+
+def encode_timestamp(value):
+    """Get a TIMESTAMP_FORMAT string as seconds since 1970 on the wall clock
+
+    Anything else, like None or a timestamp in another format, is kept as it is,
+    so decode_timestamp() always gives back the original value.
+    """
+    if type(value) is not str:
+        # Wrapped, so a number from an imported file isn't read back as a timestamp
+        return value if value is None else (value,)
+    if not TIMESTAMP_PATTERN.fullmatch(value):
+        return value
+    days = day_number(value[:10])
+    if days is None:
+        return value
+    return days * 86400 + int(value[11:13]) * 3600 + int(value[14:16]) * 60
+
+
+def decode_timestamp(value):
+    """Get the TIMESTAMP_FORMAT string of an encoded timestamp"""
+    if type(value) is not int:
+        return value[0] if type(value) is tuple else value
+    days, seconds = divmod(value, 86400)
+    return f"{day_text(days)}{seconds // 3600:02d}:{seconds // 60 % 60:02d}"
+
+
+class CodeTable:
+    """Interns repeated values, like priority names, as small integer codes"""
+
+    def __init__(self, values=()):
+        self.values = []  # Code -> value
+        self.codes = {}   # Value -> code
+        self.lock = threading.Lock()  # Stores may be built on a worker thread
+        for value in values:
+            self.code(value)
+
+    def code(self, value):
+        """Get the code of a value, adding it to the table if it is new"""
+        code = self.codes.get(value)
+        if code is None:
+            with self.lock:
+                code = self.codes.get(value)
+                if code is None:
+                    code = len(self.values)
+                    self.values.append(value)
+                    self.codes[value] = code
+        return code
+
+
+# Codes are never reused, so they stay valid for the lifetime of the process
+PRIORITY_CODES = CodeTable(DEFAULT_PRIORITIES)
+CATEGORY_CODES = CodeTable(DEFAULT_CATEGORIES)
+STATUS_CODES = CodeTable(TASK_STATUSES)
+CODE_TABLES = {'priority': PRIORITY_CODES, 'category': CATEGORY_CODES, 'status': STATUS_CODES}
+
+
+def intern_date(value):
+    return sys.intern(value) if type(value) is str else value
+
+
+# Field -> (slot, encode, decode); slots hold the encoded values
+FIELD_SLOTS = {
+    'id': ('id', None, None),
+    'title': ('title', None, None),
+    'description': ('description', None, None),
+    'due_date': ('due_date', intern_date, None),
+    'priority': ('priority_code', PRIORITY_CODES.code, PRIORITY_CODES.values.__getitem__),
+    'category': ('category_code', CATEGORY_CODES.code, CATEGORY_CODES.values.__getitem__),
+    'completed': ('completed', None, None),
+    'created_at': ('created_ts', encode_timestamp, decode_timestamp),
+    'completed_at': ('completed_ts', encode_timestamp, decode_timestamp),
+    'status': ('status_code', STATUS_CODES.code, STATUS_CODES.values.__getitem__),
+}
+
+
+class Task(MutableMapping):
+    """A task record that reads and writes like a task dict of the JSON data file
+
+    Priority, category and status are kept as codes and timestamps as integers, so
+    a task takes far less memory than a dict. Fields outside the schema, e.g. from
+    imported files, are kept in a separate dict.
+    """
+
+    __slots__ = ('id', 'title', 'description', 'due_date', 'priority_code', 'category_code',
+                 'completed', 'created_ts', 'completed_ts', 'status_code', 'extra')
+
+    def __init__(self, /, id=None, title="", description="", due_date=None, priority="🔼 Medium",
+                 category="💼 Work", completed=False, created_at=None, completed_at=None,
+                 status='todo', **extra):
+        self.id = id
+        self.title = title
+        self.description = description
+        self.due_date = intern_date(due_date)
+        self.priority_code = PRIORITY_CODES.code(priority)
+        self.category_code = CATEGORY_CODES.code(category)
+        self.completed = completed
+        self.created_ts = encode_timestamp(created_at)
+        self.completed_ts = encode_timestamp(completed_at)
+        self.status_code = STATUS_CODES.code(status)
+        self.extra = extra or None
+
+    @classmethod
+    def from_dict(cls, data):
+        """Create a task from a task dict; missing fields get their defaults"""
+        if type(data) is Task:
+            return data
+        if 'status' not in data:
+            data = dict(data, status='done' if data.get('completed') else 'todo')
+        return cls(**data)
+
+    def to_dict(self):
+        """Get the task as a dict in the JSON data file schema"""
+        task = {
+            'id': self.id,
+            'title': self.title,
+            'description': self.description,
+            'due_date': self.due_date,
+            'priority': PRIORITY_CODES.values[self.priority_code],
+            'category': CATEGORY_CODES.values[self.category_code],
+            'completed': self.completed,
+            'created_at': decode_timestamp(self.created_ts),
+            'completed_at': decode_timestamp(self.completed_ts),
+            'status': STATUS_CODES.values[self.status_code]
+        }
+        if self.extra:
+            task.update(self.extra)
+        return task
+
+    def copy(self):
+        task = Task.__new__(Task)
+        for slot in Task.__slots__:
+            setattr(task, slot, getattr(self, slot))
+        if self.extra:
+            task.extra = dict(self.extra)
+        return task
+
+    def __getitem__(self, key):
+        slot = FIELD_SLOTS.get(key)
+        if slot is None:
+            if self.extra and key in self.extra:
+                return self.extra[key]
+            raise KeyError(key)
+        value = getattr(self, slot[0])
+        return value if slot[2] is None else slot[2](value)
+
+    def __setitem__(self, key, value):
+        slot = FIELD_SLOTS.get(key)
+        if slot is None:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+        else:
+            setattr(self, slot[0], value if slot[1] is None else slot[1](value))
+
+    def __delitem__(self, key):
+        if key in FIELD_SLOTS:
+            raise KeyError(f"Task field {key!r} cannot be removed")
+        if not self.extra or key not in self.extra:
+            raise KeyError(key)
+        del self.extra[key]
+
+    def __contains__(self, key):
+        return key in FIELD_SLOTS or bool(self.extra and key in self.extra)
+
+    def __iter__(self):
+        yield from FIELD_SLOTS
+        if self.extra:
+            yield from list(self.extra)
+
+    def __len__(self):
+        return len(FIELD_SLOTS) + (len(self.extra) if self.extra else 0)
+
+    def __repr__(self):
+        return f"Task({self.to_dict()!r})"
+
+
+def json_default(value):
+    """json.dump() hook writing tasks in the JSON data file schema"""
+    if isinstance(value, Task):
+        return value.to_dict()
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+class TaskChange:
+    """A single change to the store, published to subscribers"""
+
+    ADDED = 'added'
+    REMOVED = 'removed'
+    CHANGED = 'changed'
+    RESET = 'reset'  # Everything may have changed, e.g. after loading a file
+
+    __slots__ = ('kind', 'task', 'changes')
+
+    def __init__(self, kind, task=None, changes=None):
+        self.kind = kind
+        self.task = task
+        # Field -> (old value, new value), only for CHANGED
+        self.changes = changes or {}
+
+    def __repr__(self):
+        task_id = self.task['id'] if self.task else None
+        return f"TaskChange({self.kind!r}, {task_id!r}, {self.changes!r})"
+
+    @property
+    def task_id(self):
+        return self.task['id'] if self.task else None
+
+    def touches(self, *fields):
+        """Check whether any of the fields may have a different value now"""
+        if self.kind != self.CHANGED:
+            return True
+        return any(field in self.changes for field in fields)
+
+    def before(self, field):
+        """Get the value of a field before the change, None if the task was new"""
+        if self.kind == self.ADDED or self.task is None:
+            return None
+        if field in self.changes:
+            return self.changes[field][0]
+        return self.task[field]
+
+    def after(self, field):
+        """Get the value of a field after the change, None if the task was removed"""
+        if self.kind == self.REMOVED or self.task is None:
+            return None
+        return self.task[field]
+
+
+class TaskIndex:
+    """Secondary index that a TaskStore keeps in step with its tasks"""
+
+    # Task fields the index depends on; other changes skip it
+    fields = ()
+
+    def clear(self):
+        raise NotImplementedError
+
+    def add(self, task):
+        raise NotImplementedError
+
+    def remove(self, task):
+        raise NotImplementedError
+
+    def fill(self, tasks):
+        """Add many tasks to the empty index; indexes with a faster bulk path override this"""
+        for task in tasks:
+            self.add(task)
+
+    def update(self, task, changes):
+        """Move a changed task; by default remove its old version and add it again"""
+        old = dict(task)
+        old.update({field: old_value for field, (old_value, _) in changes.items()})
+        self.remove(old)
+        self.add(task)
+
+
+class DueDateIndex(TaskIndex):
+    """Due date -> task ids, with per-day counts by priority and completion"""
+
+    fields = ('due_date', 'priority', 'completed')
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.days = {}    # 'YYYY-MM-DD' -> set of task ids
+        self.counts = {}  # 'YYYY-MM-DD' -> Counter of 'total', 'completed' and priorities
+
+    def add(self, task):
+        due_date = task['due_date']
+        if not due_date:
+            return
+        self.days.setdefault(due_date, set()).add(task['id'])
+        counts = self.counts.setdefault(due_date, Counter())
+        counts['total'] += 1
+        counts[task['priority']] += 1
+        if task['completed']:
+            counts['completed'] += 1
+
+    def remove(self, task):
+        due_date = task['due_date']
+        ids = self.days.get(due_date)
+        if not ids or task['id'] not in ids:
+            return
+        ids.discard(task['id'])
+        counts = self.counts[due_date]
+        counts['total'] -= 1
+        counts[task['priority']] -= 1
+        if task['completed']:
+            counts['completed'] -= 1
+        if not ids:
+            del self.days[due_date]
+            del self.counts[due_date]
+
+    def count(self, date_str, key='total'):
+        """Count the tasks due on a day: 'total', 'completed' or one priority"""
+        counts = self.counts.get(date_str)
+        return counts[key] if counts else 0
+
+
+class TaskAggregates(TaskIndex):
+    """Running task counters, updated in O(1) on every change"""
+
+    fields = ('completed', 'priority', 'category', 'status', 'due_date')
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.total = 0
+        self.completed = 0
+        self.by_priority = Counter()
+        self.completed_by_priority = Counter()
+        self.by_category = Counter()
+        self.completed_by_category = Counter()
+        self.by_status = Counter()
+
+        # Open tasks per due date; the overdue count is cached for one day at a time
+        self.open_by_due_date = Counter()
+        self._overdue_day = None
+        self._overdue = 0
+
+    def add(self, task):
+        self._count(task, 1)
+
+    def remove(self, task):
+        self._count(task, -1)
+
+    def _count(self, task, sign):
+        self.total += sign
+        self.by_priority[task['priority']] += sign
+        self.by_category[task['category']] += sign
+        self.by_status[task['status']] += sign
+
+        if task['completed']:
+            self.completed += sign
+            self.completed_by_priority[task['priority']] += sign
+            self.completed_by_category[task['category']] += sign
+        elif task['due_date']:
+            self.open_by_due_date[task['due_date']] += sign
+            if self._overdue_day is not None and task['due_date'] < self._overdue_day:
+                self._overdue += sign
+
+    def overdue(self, today=None):
+        """Count the open tasks due before today ('YYYY-MM-DD')"""
+        today = today or datetime.now().strftime("%Y-%m-%d")
+        if today != self._overdue_day:
+            self._overdue_day = today
+            self._overdue = sum(count for due_date, count in self.open_by_due_date.items()
+                                if due_date < today)
+        return self._overdue
+
+
+class SearchIndex(TaskIndex):
+    """Inverted index of title and description words, searchable by word prefix"""
+
+    fields = ('title', 'description')
+
+    TITLE_WEIGHT = 3   # A word in the title counts as much as three in the description
+    EXACT_BONUS = 2    # Whole-word matches rank above prefix matches
+    MIN_PREFIX = 2     # Shorter query words only match whole words
+    BULK_WORDS = 64    # More new or dropped words than this re-sort the vocabulary at once
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.postings = {}     # Word -> {weight: set of task ids}
+        self._vocabulary = []  # Sorted words, so a prefix is a contiguous range
+        self._touched = []     # Words added or dropped since the vocabulary was sorted
+
+    @property
+    def vocabulary(self):
+        """Sorted indexed words, catching up with words added or dropped since the last lookup"""
+        if len(self._touched) > self.BULK_WORDS:
+            self._vocabulary = sorted(self.postings)
+        else:
+            vocabulary = self._vocabulary
+            for word in self._touched:
+                i = bisect_left(vocabulary, word)
+                listed = i < len(vocabulary) and vocabulary[i] == word
+                if word in self.postings and not listed:
+                    vocabulary.insert(i, word)
+                elif word not in self.postings and listed:
+                    del vocabulary[i]
+        self._touched = []
+        return self._vocabulary
+
+    def weights(self, task):
+        """Get word -> weight for the words of a task"""
+        weights = {}
+        for word in tokenize(task['title']):
+            weights[word] = weights.get(word, 0) + self.TITLE_WEIGHT
+        for word in tokenize(task['description']):
+            weights[word] = weights.get(word, 0) + 1
+        return weights
+
+    def add(self, task):
+        task_id = task['id']
+        for word, weight in self.weights(task).items():
+            postings = self.postings.get(word)
+            if postings is None:
+                postings = self.postings[word] = {}
+                self._touched.append(word)
+            ids = postings.get(weight)
+            if ids is None:
+                ids = postings[weight] = set()
+            ids.add(task_id)
+
+    def remove(self, task):
+        task_id = task['id']
+        for word, weight in self.weights(task).items():
+            postings = self.postings.get(word)
+            ids = postings.get(weight) if postings is not None else None
+            if ids is None:
+                continue
+            ids.discard(task_id)
+            if not ids:
+                del postings[weight]
+                if not postings:
+                    del self.postings[word]
+                    self._touched.append(word)
+
+    def words_with_prefix(self, prefix):
+        """Get the indexed words starting with prefix"""
+        if len(prefix) < self.MIN_PREFIX:
+            return [prefix] if prefix in self.postings else []
+
+        vocabulary = self.vocabulary
+        start = bisect_left(vocabulary, prefix)
+        end = bisect_left(vocabulary, prefix + '\U0010ffff', start)
+        return vocabulary[start:end]
+
+    def match_count(self, word):
+        """Get an upper bound of the number of tasks matching a query word"""
+        return sum(len(ids) for indexed_word in self.words_with_prefix(word)
+                   for ids in self.postings[indexed_word].values())
+
+    def score_levels(self, word, within=None):
+        """Generate (score, task ids) for the tasks matching a query word, best score first
+
+        A task matching several indexed words is only in the set of its best score.
+        With within, only those task ids are considered.
+        """
+        indexed_words = self.words_with_prefix(word)
+        if len(indexed_words) == 1:
+            # The sets of one word are disjoint already; they are the index's own, so read only
+            bonus = self.EXACT_BONUS if indexed_words[0] == word else 1
+            for weight, ids in sorted(self.postings[indexed_words[0]].items(), reverse=True):
+                ids = ids if within is None else ids & within
+                if ids:
+                    yield weight * bonus, ids
+            return
+
+        by_score = {}
+        for indexed_word in indexed_words:
+            bonus = self.EXACT_BONUS if indexed_word == word else 1
+            for weight, ids in self.postings[indexed_word].items():
+                by_score.setdefault(weight * bonus, []).append(ids if within is None else ids & within)
+
+        seen = set()
+        for score in sorted(by_score, reverse=True):
+            ids = set().union(*by_score[score])
+            ids -= seen
+            if ids:
+                yield score, ids
+                seen |= ids
+
+    def search(self, query, limit=None):
+        """Get the ids of tasks matching every query word, best matches first
+
+        Tasks are ranked by set operations on the ids of each score, never one by one;
+        a one word query stops at the scores needed for limit ids, and only those are sorted.
+        """
+        # The word matching the fewest tasks narrows down the rest
+        words = sorted(tokenize(query), key=self.match_count)
+        if not words:
+            return []
+
+        # (Total score, ids), best first, for the words so far
+        levels = self.score_levels(words[0])
+        for word in words[1:]:
+            levels = list(levels)
+            candidates = set().union(*(ids for _, ids in levels))
+            word_levels = list(self.score_levels(word, candidates))
+            combined = {}
+            for score, ids in levels:
+                for word_score, word_ids in word_levels:
+                    both = ids & word_ids
+                    if both:
+                        total = score + word_score
+                        if total in combined:
+                            combined[total] |= both
+                        else:
+                            combined[total] = both
+            if not combined:
+                return []
+            levels = sorted(combined.items(), key=itemgetter(0), reverse=True)
+
+        result = []
+        for score, ids in levels:
+            if limit is not None and len(result) + len(ids) >= limit:
+                result.extend(heapq.nsmallest(limit - len(result), ids))
+                break
+            result.extend(sorted(ids))
+        return result
+
+
+# Byte value -> positions of its set bits, for walking bitmaps a byte at a time
+BYTE_BITS = [tuple(bit for bit in range(8) if byte >> bit & 1) for byte in range(256)]
+
+
+def bitmap_of(rows, size):
+    """Get the bitmap with the bits of the given rows set, in O(size / 8 + len(rows))"""
+    bits = bytearray((size + 7) // 8)
+    for row in rows:
+        bits[row >> 3] |= 1 << (row & 7)
+    return int.from_bytes(bits, 'little')
+
+
+class TaskTable(TaskIndex):
+    """Column-oriented copy of the fields tasks are filtered by, with a bitmap per value
+
+    Every task has a row; bit n of a bitmap (a Python int) stands for row n, and
+    rows of removed tasks are reused. Filters combine bitmaps with & | and ~, and
+    group counts are bit counts, so neither touches the task records.
+    """
+
+    fields = ('priority', 'category', 'status', 'completed', 'due_date')
+    grouped = ('priority', 'category', 'status', 'completed')  # Fields with a bitmap per value
+
+    NO_DUE_DATE = -2 ** 31
+    ROW_BITS = 32  # Low bits of a due_order entry, holding the row
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.rows = {}              # Task id -> row
+        self.row_ids = array('q')   # Row -> task id
+        self.free_rows = []
+        self.live = 0               # Bitmap of the rows in use
+
+        # One array per field, holding value codes; due dates as days since 1970
+        self.columns = {field: array('H') for field in ('priority', 'category', 'status')}
+        self.columns['completed'] = array('b')
+        self.columns['due_date'] = array('i')
+
+        # Field -> value code -> bitmap
+        self.bitmaps = {field: {} for field in self.grouped}
+
+        # Rows with a due date as days << ROW_BITS | row, sorted, for date ranges by bisect
+        self.due_order = array('q')
+
+    @classmethod
+    def codes(cls, task):
+        """Get the column values of a task"""
+        if type(task) is not Task:
+            task = Task.from_dict(task)  # Old versions of tasks come as dicts
+        due_date = task.due_date
+        days = day_number(due_date[:10]) if type(due_date) is str else None
+        return {
+            'id': task.id,
+            'priority': task.priority_code,
+            'category': task.category_code,
+            'status': task.status_code,
+            'completed': int(bool(task.completed)),
+            'due_date': cls.NO_DUE_DATE if days is None else days
+        }
+
+    def add(self, task):
+        codes = self.codes(task)
+        if self.free_rows:
+            row = self.free_rows.pop()
+            self.row_ids[row] = task['id']
+            for field, column in self.columns.items():
+                column[row] = codes[field]
+        else:
+            row = len(self.row_ids)
+            self.row_ids.append(task['id'])
+            for field, column in self.columns.items():
+                column.append(codes[field])
+
+        self.rows[task['id']] = row
+        bit = 1 << row
+        self.live |= bit
+        for field in self.grouped:
+            bitmaps = self.bitmaps[field]
+            bitmaps[codes[field]] = bitmaps.get(codes[field], 0) | bit
+        self.add_due(codes['due_date'], row)
+
+    def remove(self, task):
+        row = self.rows.pop(task['id'], None)
+        if row is None:
+            return
+        mask = ~(1 << row)
+        self.live &= mask
+        for field in self.grouped:
+            bitmaps = self.bitmaps[field]
+            code = self.columns[field][row]
+            bitmaps[code] &= mask
+        self.remove_due(self.columns['due_date'][row], row)
+        self.free_rows.append(row)
+
+    def update(self, task, changes):
+        """Move only the changed columns of the task's row"""
+        row = self.rows[task['id']]
+        codes = self.codes(task)
+        bit = 1 << row
+        for field in self.fields:
+            column = self.columns[field]
+            if column[row] == codes[field]:
+                continue
+            if field in self.bitmaps:
+                bitmaps = self.bitmaps[field]
+                bitmaps[column[row]] &= ~bit
+                bitmaps[codes[field]] = bitmaps.get(codes[field], 0) | bit
+            elif field == 'due_date':
+                self.remove_due(column[row], row)
+                self.add_due(codes[field], row)
+            column[row] = codes[field]
+
+    def fill(self, tasks):
+        """Build the columns first and each bitmap in one pass"""
+        groups = {field: {} for field in self.grouped}
+        columns = list(self.columns.items())
+        grouped = [(field, groups[field]) for field in self.grouped]
+        for row, task in enumerate(tasks):
+            codes = self.codes(task)
+            task_id = codes['id']
+            self.rows[task_id] = row
+            self.row_ids.append(task_id)
+            for field, column in columns:
+                column.append(codes[field])
+            for field, rows_by_code in grouped:
+                rows_by_code.setdefault(codes[field], []).append(row)
+
+        size = len(self.row_ids)
+        self.live = (1 << size) - 1
+        self.due_order = array('q', sorted(
+            days << self.ROW_BITS | row for row, days in enumerate(self.columns['due_date'])
+            if days != self.NO_DUE_DATE))
+        for field, rows_by_code in groups.items():
+            self.bitmaps[field] = {code: bitmap_of(rows, size) for code, rows in rows_by_code.items()}
+
+    def add_due(self, days, row):
+        if days != self.NO_DUE_DATE:
+            insort(self.due_order, days << self.ROW_BITS | row)
+
+    def remove_due(self, days, row):
+        if days != self.NO_DUE_DATE:
+            del self.due_order[bisect_left(self.due_order, days << self.ROW_BITS | row)]
+
+    # ==============================================
+    # Queries
+    # ==============================================
+
+    def bitmap(self, field, value):
+        """Get the bitmap of the tasks whose field has a value, e.g. ('priority', '⚠️ High')"""
+        if field == 'completed':
+            code = int(bool(value))
+        else:
+            code = CODE_TABLES[field].codes.get(value)
+        return self.bitmaps[field].get(code, 0)
+
+    def due_between(self, start=None, end=None):
+        """Get the bitmap of the tasks due from start to end ('YYYY-MM-DD', inclusive)
+
+        Two bisections find the range, so this takes O(log N + matches).
+        """
+        due_order, shift = self.due_order, self.ROW_BITS
+        low = bisect_left(due_order, day_number(start) << shift) if start else 0
+        high = bisect_left(due_order, day_number(end) + 1 << shift) if end else len(due_order)
+        mask = (1 << shift) - 1
+        return bitmap_of((entry & mask for entry in due_order[low:high]), len(self.row_ids))
+
+    def task_ids(self, bitmap):
+        """Get the ids of the tasks in a bitmap, in row order"""
+        row_ids = self.row_ids
+        ids = []
+        for index, byte in enumerate(bitmap.to_bytes((bitmap.bit_length() + 7) // 8, 'little')):
+            if byte:
+                base = index << 3
+                ids.extend(row_ids[base + bit] for bit in BYTE_BITS[byte])
+        return ids
+
+    def counts(self, field, within=None):
+        """Count the tasks per value of a field, optionally only those in a bitmap, e.g. a filter's"""
+        values = [False, True] if field == 'completed' else CODE_TABLES[field].values
+        counts = {}
+        for code, bitmap in self.bitmaps[field].items():
+            if within is not None:
+                bitmap &= within
+            if bitmap:
+                counts[values[code]] = bitmap.bit_count()
+        return counts
+
+
+class OrderIndex(TaskIndex):
+    """Task ids kept sorted by a key, moved with bisect as tasks change
+
+    The key must end with the task id, so every key is unique.
+    """
+
+    def __init__(self, key, fields):
+        self.key = key
+        self.fields = tuple(fields)
+        self.clear()
+
+    def clear(self):
+        self.keys = []       # Sort keys of all tasks, in order
+        self.task_keys = {}  # Task id -> sort key
+
+    def add(self, task):
+        key = self.key(task)
+        self.task_keys[task['id']] = key
+        insort(self.keys, key)
+
+    def remove(self, task):
+        key = self.task_keys.pop(task['id'], None)
+        if key is not None:
+            del self.keys[bisect_left(self.keys, key)]
+
+    def update(self, task, changes):
+        key = self.key(task)
+        old_key = self.task_keys[task['id']]
+        if key != old_key:
+            del self.keys[bisect_left(self.keys, old_key)]
+            insort(self.keys, key)
+            self.task_keys[task['id']] = key
+
+    def fill(self, tasks):
+        self.task_keys = {task['id']: self.key(task) for task in tasks}
+        self.keys = sorted(self.task_keys.values())
+
+    def ordered(self, task_ids=None):
+        """Get the ids of all tasks in order, or only of the given tasks"""
+        if task_ids is None:
+            return [key[-1] for key in self.keys]
+        task_keys = self.task_keys
+        wanted = [task_id for task_id in task_ids if task_id in task_keys]
+        # Few tasks are sorted by their keys, many are picked out of the full order
+        if len(wanted) * 8 < len(task_keys):
+            return sorted(wanted, key=task_keys.__getitem__)
+        wanted = set(wanted)
+        return [key[-1] for key in self.keys if key[-1] in wanted]
+
+
+class TaskStore:
+    """In-memory task collection indexed by task id"""
+
+    def __init__(self, tasks=None, next_id=None):
+        # Insertion ordered id -> task mapping, so lookups and deletes are O(1)
+        self._tasks = {}
+        self.next_id = 1
+        self._indexes = []
+
+        # Change subscribers and changes held back by batch()
+        self._subscribers = []
+        self._batch_depth = 0
+        self._pending = []
+
+        # Copy-on-write state for snapshot(): ids of tasks copied since the last one
+        self._shared = False
+        self._private = set()
+
+        if tasks:
+            self.load(tasks, next_id)
+
+    def __len__(self):
+        return len(self._tasks)
+
+    def __iter__(self):
+        return iter(self._tasks.values())
+
+    def __contains__(self, task_id):
+        return task_id in self._tasks
+
+    def get(self, task_id):
+        """Get a task by id, or None if it does not exist"""
+        return self._tasks.get(task_id)
+
+    def allocate_id(self):
+        """Reserve the next task id; ids are never reused, even after deletes"""
+        task_id = self.next_id
+        self.next_id += 1
+        return task_id
+
+    def add_index(self, index):
+        """Attach a secondary index and fill it with the current tasks"""
+        self._indexes.append(index)
+        self._fill_index(index)
+        return index
+
+    def remove_index(self, index):
+        """Detach a secondary index; the store stops updating it"""
+        self._indexes.remove(index)
+
+    def _fill_index(self, index):
+        index.clear()
+        index.fill(self._tasks.values())
+
+    def _rebuild_indexes(self):
+        for index in self._indexes:
+            self._fill_index(index)
+
+    # ==============================================
+    # Change Events
+    # ==============================================
+
+    def subscribe(self, callback):
+        """Call callback(changes) with a list of TaskChange after every mutation"""
+        self._subscribers.append(callback)
+
+    def unsubscribe(self, callback):
+        """Stop sending changes to a subscriber"""
+        self._subscribers.remove(callback)
+
+    @contextmanager
+    def batch(self):
+        """Publish all changes made inside the block as a single list"""
+        self._batch_depth += 1
+        try:
+            yield self
+        finally:
+            self._batch_depth -= 1
+            if not self._batch_depth:
+                self._flush()
+
+    def _emit(self, change):
+        self._pending.append(change)
+        if not self._batch_depth:
+            self._flush()
+
+    def _flush(self):
+        if not self._pending:
+            return
+        changes, self._pending = self._pending, []
+        for callback in list(self._subscribers):
+            callback(changes)
+
+    # ==============================================
+    # Mutations
+    # ==============================================
+
+    def add(self, title, description="", due_date=None, priority="🔼 Medium", category="💼 Work"):
+        """Create a new task and return it"""
+        task = Task(
+            id=self.allocate_id(),
+            title=title,
+            description=description,
+            due_date=due_date,
+            priority=priority,
+            category=category,
+            created_at=datetime.now().strftime(TIMESTAMP_FORMAT)
+        )
+
+        self._tasks[task['id']] = task
+        self._private.add(task['id'])
+        for index in self._indexes:
+            index.add(task)
+        self._emit(TaskChange(TaskChange.ADDED, task))
+        return task
+
+    def insert(self, task):
+        """Insert a task or task dict under a freshly allocated id and return the task"""
+        task = Task.from_dict(task)
+        task['id'] = self.allocate_id()
+        self._tasks[task['id']] = task
+        self._private.add(task['id'])
+        for index in self._indexes:
+            index.add(task)
+        self._emit(TaskChange(TaskChange.ADDED, task))
+        return task
+
+    def insert_many(self, tasks):
+        """Insert tasks or task dicts under a block of fresh ids, published as one change list"""
+        tasks = [Task.from_dict(task) for task in tasks]
+        first_id = self.next_id
+        self.next_id += len(tasks)
+        with self.batch():
+            for task_id, task in enumerate(tasks, first_id):
+                task.id = task_id
+                self._tasks[task_id] = task
+                self._private.add(task_id)
+                for index in self._indexes:
+                    index.add(task)
+                self._emit(TaskChange(TaskChange.ADDED, task))
+        return tasks
+
+    def update(self, task_id, **fields):
+        """Update fields of a task and return it; unknown fields and the id are ignored
+
+        The returned Task may be a new copy if a snapshot still shares the old one.
+        """
+        task = self._tasks.get(task_id)
+        if task is None:
+            return None
+
+        changes = {}
+        for key, value in fields.items():
+            if key in task and key != 'id' and task[key] != value:  # Don't allow changing the ID
+                changes[key] = (task[key], value)
+
+        if changes:
+            task = self._own(task_id)
+            for key, (_, value) in changes.items():
+                task[key] = value
+
+        if changes:
+            for index in self._indexes:
+                if any(field in changes for field in index.fields):
+                    index.update(task, changes)
+            self._emit(TaskChange(TaskChange.CHANGED, task, changes))
+        return task
+
+    def remove(self, task_id):
+        """Remove a task and return it, or None if it does not exist"""
+        task = self._tasks.pop(task_id, None)
+        if task is not None:
+            for index in self._indexes:
+                index.remove(task)
+            self._emit(TaskChange(TaskChange.REMOVED, task))
+        return task
+
+    def clear(self):
+        """Remove all tasks; the id counter keeps counting"""
+        self._tasks.clear()
+        self._rebuild_indexes()
+        self._emit(TaskChange(TaskChange.RESET))
+
+    # ==============================================
+    # Serialization
+    # ==============================================
+
+    def load(self, tasks, next_id=None):
+        """Replace the contents with saved tasks"""
+        self._tasks = {}
+        self._shared = False  # No snapshot shares the new tasks
+        pending = []
+
+        for task in map(Task.from_dict, tasks):
+            task_id = task.id
+            if isinstance(task_id, int) and task_id not in self._tasks:
+                self._tasks[task_id] = task
+            else:
+                # Older data files could contain duplicate ids
+                pending.append(task)
+
+        highest = max(self._tasks, default=0)
+        self.next_id = max(next_id or 1, highest + 1)
+
+        for task in pending:
+            task.id = self.allocate_id()
+            self._tasks[task['id']] = task
+
+        self._rebuild_indexes()
+        self._emit(TaskChange(TaskChange.RESET))
+
+    def to_list(self):
+        """Get all tasks as a list, in insertion order"""
+        return list(self._tasks.values())
+
+    def snapshot(self):
+        """Get a list of all tasks that later mutations leave untouched
+
+        Only references are copied here; a task is copied on its first update
+        after the snapshot, so the snapshot can be serialized on another thread.
+        """
+        self._shared = True
+        self._private = set()
+        return list(self._tasks.values())
+
+    def _own(self, task_id):
+        """Get a Task record that is safe to mutate, copying it if a snapshot shares it"""
+        task = self._tasks[task_id]
+        if self._shared and task_id not in self._private:
+            task = self._tasks[task_id] = task.copy()
+            self._private.add(task_id)
+        return task
@@ -0,0 +1,103 @@
+import json
+import os
+import tempfile
+import unittest
+
+from backup import BACKUP_MAGIC, SEGMENT_SPAN, BackupError, BackupFile
+from task_store import TaskStore
+
+SETTINGS = {'categories': ["A"], 'priorities': ["B"], 'colors': {}}
+
+
+class BackupFileTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'tasks.empressbak')
+        # Enough tasks for several segments
+        self.store = TaskStore()
+        for i in range(SEGMENT_SPAN * 2 + 10):
+            self.store.add(f"Task {i}")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def backup(self):
+        return BackupFile(self.path).write(self.store.snapshot(), self.store.next_id, SETTINGS)
+
+    def test_round_trip(self):
+        written, reused = self.backup()
+        self.assertEqual((written, reused), (3, 0))
+        data = BackupFile(self.path).restore()
+        self.assertEqual(data['tasks'], [task.to_dict() for task in self.store])
+        self.assertEqual(data['next_id'], self.store.next_id)
+        self.assertEqual(data['categories'], ["A"])
+        self.assertEqual(BackupFile(self.path).verify(), [])
+
+    def test_later_backups_only_add_changed_segments(self):
+        self.backup()
+        before = [task.to_dict() for task in self.store]
+        self.store.update(self.store.next_id - 1, title="Changed")
+        self.assertEqual(self.backup(), (1, 2))
+
+        backup = BackupFile(self.path)
+        self.assertEqual(len(backup.points()), 2)
+        self.assertEqual(backup.restore(0)['tasks'], before)
+        self.assertEqual(backup.restore()['tasks'][-1]['title'], "Changed")
+
+    def test_bad_checksum(self):
+        self.backup()
+        with open(self.path, 'r+b') as f:
+            # Flip a bit inside the first segment's compressed data
+            f.seek(len(BACKUP_MAGIC) + 5 + 32 + 20)
+            byte = f.read(1)
+            f.seek(-1, os.SEEK_CUR)
+            f.write(bytes([byte[0] ^ 1]))
+
+        backup = BackupFile(self.path)
+        with self.assertRaises(BackupError):
+            backup.restore()
+        self.assertTrue(backup.verify())
+
+    def test_torn_backup_is_dropped(self):
+        self.backup()
+        self.store.add("New")
+        self.backup()
+        with open(self.path, 'r+b') as f:
+            f.truncate(os.path.getsize(self.path) - 10)  # A crash while appending
+
+        backup = BackupFile(self.path)
+        self.assertEqual(len(backup.points()), 1)
+        self.assertEqual(len(backup.restore()['tasks']), len(self.store) - 1)
+        problems = backup.verify()
+        self.assertEqual(len(problems), 1)
+        self.assertTrue(problems[0].startswith("Incomplete data"))
+
+        # The next backup replaces the torn one
+        self.backup()
+        self.assertEqual(len(backup.points()), 2)
+        self.assertEqual(backup.restore()['tasks'], [task.to_dict() for task in self.store])
+        self.assertEqual(backup.verify(), [])
+
+    def test_version_1_backup(self):
+        legacy = {'tasks': [{'id': 1, 'title': "Old"}], 'next_id': 2, 'version': 1,
+                  'categories': ["A"]}
+        with open(self.path, 'w') as f:
+            json.dump(legacy, f, indent=2)
+
+        backup = BackupFile(self.path)
+        self.assertFalse(backup.can_append())
+        self.assertEqual(backup.points()[0]['count'], 1)
+        self.assertEqual(backup.restore(), legacy)
+        self.assertEqual(backup.verify(), [])
+
+        # Never replaced unless asked to
+        with self.assertRaises(BackupError):
+            self.backup()
+        self.assertEqual(backup.restore(), legacy)
+        BackupFile(self.path).write(self.store.snapshot(), self.store.next_id, SETTINGS, replace=True)
+        self.assertEqual(len(backup.restore()['tasks']), len(self.store))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,129 @@
+import json
+import os
+import tempfile
+import unittest
+
+from storage import JournalStorage
+from task_store import TaskStore
+
+
+def open_store(path):
+    """Load the saved data like the app does and follow the store from there on"""
+    storage = JournalStorage(path)
+    data = storage.load() or {}
+    store = TaskStore(data.get('tasks'), data.get('next_id'))
+    storage.attach(store)
+    return storage, store
+
+
+def titles(store):
+    return sorted((task['id'], task['title']) for task in store)
+
+
+class JournalStorageTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'tasks.json')
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write_snapshot(self, tasks, next_id=None):
+        with open(self.path, 'w') as f:
+            json.dump({'tasks': tasks, 'next_id': next_id}, f)
+
+    def test_round_trip(self):
+        storage, store = open_store(self.path)
+        first = store.add("Write report")
+        second = store.add("Call mum", due_date="2024-05-01")
+        store.add("Water plants")
+        store.update(first['id'], title="Write the report", completed=True)
+        store.remove(second['id'])
+        storage.save({'categories': ['A'], 'priorities': ['B'], 'colors': {}})
+        expected = titles(store)
+        storage.close()
+
+        storage, store = open_store(self.path)
+        self.assertEqual(titles(store), expected)
+        self.assertTrue(store.get(first['id'])['completed'])
+        self.assertEqual(storage.settings['categories'], ['A'])
+        storage.close()
+
+    def test_torn_journal_tail_is_dropped(self):
+        storage, store = open_store(self.path)
+        store.add("Kept")
+        storage.close()
+        with open(self.path + '.journal', 'a') as f:
+            f.write('{"op":"put","task":{"id":9,"ti')  # A crash in the middle of a record
+
+        storage, store = open_store(self.path)
+        self.assertEqual(titles(store), [(1, "Kept")])
+        # Records written after the torn one are replayed on the next load
+        store.add("Added later")
+        storage.close()
+        storage, store = open_store(self.path)
+        self.assertEqual(titles(store), [(1, "Kept"), (2, "Added later")])
+        storage.close()
+
+    def test_compaction_folds_journal_into_snapshot(self):
+        storage, store = open_store(self.path)
+        storage.COMPACT_BYTES = 512
+        for i in range(50):
+            store.add(f"Task {i}")
+        expected = titles(store)
+        storage.close()
+
+        self.assertFalse(os.path.exists(self.path + '.journal.sealed'))
+        with open(self.path) as f:
+            self.assertGreater(len(json.load(f)['tasks']), 0)
+        storage, store = open_store(self.path)
+        self.assertEqual(titles(store), expected)
+        storage.close()
+
+    def test_interrupted_compaction_is_finished_on_load(self):
+        self.write_snapshot([{'id': 1, 'title': "Old"}], 2)
+        with open(self.path + '.journal.sealed', 'w') as f:
+            f.write('{"op":"put","task":{"id":1,"title":"Renamed"}}\n')
+        with open(self.path + '.journal', 'w') as f:
+            f.write('{"op":"put","task":{"id":2,"title":"New"}}\n')
+
+        storage, store = open_store(self.path)
+        self.assertEqual(titles(store), [(1, "Renamed"), (2, "New")])
+        storage.close()
+        self.assertFalse(os.path.exists(self.path + '.journal.sealed'))
+        storage, store = open_store(self.path)
+        self.assertEqual(titles(store), [(1, "Renamed"), (2, "New")])
+        storage.close()
+
+    def test_repaired_duplicate_ids_are_kept(self):
+        # Older versions gave new tasks len(tasks) + 1, which could repeat an id
+        self.write_snapshot([{'id': 1, 'title': "a"}, {'id': 2, 'title': "b"},
+                             {'id': 2, 'title': "c"}], 3)
+        for suffix in ("!", "!!"):
+            storage, store = open_store(self.path)
+            task = next(task for task in store if task['title'].startswith("c"))
+            store.update(task['id'], title=task['title'] + "!")
+            storage.close()
+            storage, store = open_store(self.path)
+            self.assertEqual(titles(store), [(1, "a"), (2, "b"), (3, "c" + suffix)])
+            storage.close()
+
+    def test_failed_load_leaves_data_alone(self):
+        with open(self.path, 'w') as f:
+            f.write('{"tasks": [')
+        journal = '{"op":"put","task":{"id":5,"title":"x"}}\n'
+        with open(self.path + '.journal', 'w') as f:
+            f.write(journal)
+
+        storage = JournalStorage(self.path)
+        with self.assertRaises(ValueError):
+            storage.load()
+        with self.assertRaises(RuntimeError):
+            storage.attach(TaskStore())
+        with open(self.path + '.journal') as f:
+            self.assertEqual(f.read(), journal)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,111 @@
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from task_io import TaskExporter, TaskImporter, iter_json_records
+from task_store import TaskStore
+
+
+def records(text, chunk_size=7):
+    """Read records from text in small chunks, so values span chunk boundaries"""
+    return [record for record, _ in iter_json_records(io.BytesIO(text.encode('utf-8')), chunk_size)]
+
+
+class JsonRecordsTest(unittest.TestCase):
+
+    def test_array_and_ndjson(self):
+        tasks = [{'title': "ünïcode ✓", 'n': 12345}, {'title': "b", 'tags': [1, 2]}, 7]
+        self.assertEqual(records(json.dumps(tasks, ensure_ascii=False)), tasks)
+        self.assertEqual(records(json.dumps(tasks, indent=2)), tasks)
+        self.assertEqual(records('\n'.join(json.dumps(task) for task in tasks) + '\n'), tasks)
+        self.assertEqual(records('[]'), [])
+        self.assertEqual(records(''), [])
+
+    def test_byte_order_mark(self):
+        data = '\ufeff[{"title": "a"}]'.encode('utf-8')
+        self.assertEqual([r for r, _ in iter_json_records(io.BytesIO(data))], [{'title': "a"}])
+
+    def test_truncated_array(self):
+        with self.assertRaises(ValueError):
+            records('[{"title": "a"}, {"title": "b"}')
+        with self.assertRaises(ValueError):
+            records('[{"title": "a"}, {"title": "b"')
+
+    def test_missing_separator(self):
+        with self.assertRaises(ValueError):
+            records('[{"title": "a"} {"title": "b"}]')
+
+
+class TaskImporterTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def write(self, name, text):
+        path = os.path.join(self.directory.name, name)
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(text)
+        return path
+
+    def test_import_normalizes_and_skips(self):
+        path = self.write('tasks.json', json.dumps([
+            {'title': "  Pay rent ", 'due_date': "2024-05-01T10:00", 'id': 1},
+            {'title': ""},
+            "not a task",
+            {'title': "Done", 'completed': True, 'status': "bogus"},
+        ]))
+        store = TaskStore([{'id': 1, 'title': "Existing"}])
+        importer = TaskImporter(store, path, batch_size=1)
+        self.assertEqual(importer.run(), 2)
+        self.assertEqual(importer.skipped, 2)
+        self.assertEqual(importer.progress, 1.0)
+
+        rent, done = (store.get(task_id) for task_id in importer.imported_ids)
+        self.assertEqual((rent['title'], rent['due_date']), ("Pay rent", "2024-05-01"))
+        self.assertNotEqual(rent['id'], 1)  # Imported tasks never replace existing ones
+        self.assertEqual(done['status'], 'done')
+        self.assertEqual(len(store), 3)
+
+    def test_cancel_removes_imported_tasks(self):
+        path = self.write('tasks.ndjson', ''.join(
+            json.dumps({'title': f"Task {i}"}) + '\n' for i in range(10)))
+        store = TaskStore()
+        importer = TaskImporter(store, path, batch_size=4)
+        self.assertTrue(importer.step())
+        self.assertEqual(len(store), 4)
+        importer.cancel()
+        self.assertEqual(len(store), 0)
+
+    def test_truncated_file_keeps_whole_batches(self):
+        path = self.write('tasks.json', '[' + ','.join(
+            json.dumps({'title': f"Task {i}"}) for i in range(5)) + ',{"title": "Tor')
+        store = TaskStore()
+        importer = TaskImporter(store, path, batch_size=2)
+        with self.assertRaises(ValueError):
+            importer.run()
+        importer.close()
+        self.assertEqual(len(store), 4)
+
+    def test_export_round_trip(self):
+        store = TaskStore()
+        for i in range(25):
+            store.add(f"Task {i}", due_date=f"2024-05-{i + 1:02d}")
+        for extension in ('.ndjson', '.json'):
+            path = os.path.join(self.directory.name, 'export' + extension)
+            exporter = TaskExporter(store.snapshot(), path, chunk_size=10)
+            exporter.run()
+            self.assertIsNone(exporter.error)
+
+            imported = TaskStore()
+            TaskImporter(imported, path).run()
+            self.assertEqual([(t['title'], t['due_date']) for t in imported],
+                             [(t['title'], t['due_date']) for t in store])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -2,11 +2,445 @@ import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext, font
 from tkinter.colorchooser import askcolor
 from datetime import datetime, timedelta
-import json
+from bisect import bisect_left, insort
+import calendar
 import os
 import random
+import threading
 import webbrowser
 
+from backup import BackupFile
+from profiling import Profiler
+from storage import JsonStorage, JournalStorage, SQLiteStorage
+from task_io import TaskImporter, TaskExporter, export_filter
+from task_query import All, Any, DueBetween, Field
+from task_store import (TaskStore, TaskChange, DueDateIndex, TaskAggregates, SearchIndex,
+                        TaskTable, OrderIndex, DEFAULT_CATEGORIES, DEFAULT_PRIORITIES,
+                        CATEGORY_CODES, PRIORITY_CODES)
+
+# Views with more pending changes than this are refreshed as a whole
+BULK_REFRESH_THRESHOLD = 200
+
+# Search runs once typing pauses for this long
+SEARCH_DEBOUNCE_MS = 150
+
+# 'json' keeps a JSON snapshot plus a journal of changes, 'snapshot' rewrites the
+# whole JSON file on every save, 'sqlite' uses a database
+STORAGE_BACKEND = os.environ.get('EMPRESS_TODO_STORAGE', 'json')
+
+# Show the window first and load saved data on a worker thread; '0' loads before showing it
+FAST_START = os.environ.get('EMPRESS_TODO_FAST_START', '1') != '0'
+
+# Changes made within this window after the first unsaved one are saved together
+AUTOSAVE_DELAY_MS = int(os.environ.get('EMPRESS_TODO_AUTOSAVE_MS', 2000))
+
+# Time the hot paths and show the results in the status bar; '0' leaves them untouched
+PROFILE = os.environ.get('EMPRESS_TODO_PROFILE', '0') != '0'
+PERF_OVERLAY_MS = 1000
+
+# Methods timed when profiling, by trace category
+PROFILED_METHODS = {
+    'view': ('update_task_list', 'refresh_list_rows', 'update_board_view', 'refresh_board_cards',
+             'update_calendar_view', 'refresh_calendar_days', 'update_progress_view',
+             'update_status_bar', 'update_sidebar_stats'),
+    'filter': ('filter_tasks', 'perform_search', 'filtered_task_ids'),
+    'store': ('on_store_changed',),
+    'storage': ('save_data', 'read_saved_data', 'finish_loading'),
+}
+
+# filter_tasks() types that stand for one sidebar toggle -> (group, value)
+FILTER_TOGGLES = {'today': ('due', 'today'), 'upcoming': ('due', 'upcoming'),
+                  'week': ('due', 'week'), 'overdue': ('due', 'overdue'),
+                  'completed': ('state', 'completed')}
+
+# List view column -> heading text, and the order clicking the heading switches to
+LIST_HEADINGS = {'completed': '✓', 'title': 'Task', 'due_date': 'Due Date', 'priority': 'Priority',
+                 'category': 'Category', 'created_at': 'Created'}
+LIST_COLUMN_ORDERS = {'completed': 'default', 'title': 'title', 'due_date': 'due_date',
+                      'priority': 'default', 'category': 'category', 'created_at': 'created_at'}
+
+# Height of a list view row in pixels; the list view pages by it
+LIST_ROW_HEIGHT = 25
+
+
+class RenderScheduler:
+    """Merges view refreshes into one repaint per idle cycle, skipping hidden views"""
+    
+    def __init__(self, root, is_visible, limit=BULK_REFRESH_THRESHOLD):
+        self.root = root
+        self.is_visible = is_visible
+        self.limit = limit
+        self.views = {}    # Name -> (full refresh, partial refresh or None)
+        self.dirty = {}    # Name -> set of pending items, or None for a full refresh
+        self.idle_job = None
+    
+    def register(self, name, refresh, refresh_items=None):
+        """Register a view; refresh_items(items) repaints only part of it"""
+        self.views[name] = (refresh, refresh_items)
+    
+    def invalidate(self, name=None):
+        """Schedule a full refresh of one view, or of all views"""
+        for view in (self.views if name is None else [name]):
+            self.dirty[view] = None
+        self.schedule()
+    
+    def mark(self, name, items):
+        """Schedule a partial refresh of some items (task ids, days...) of a view"""
+        if not items or (name in self.dirty and self.dirty[name] is None):
+            return
+        
+        pending = self.dirty.get(name, set()) | set(items)
+        if self.views[name][1] is None or len(pending) > self.limit:
+            pending = None
+        self.dirty[name] = pending
+        self.schedule()
+    
+    def schedule(self):
+        """Flush on the next idle cycle if any visible view is dirty"""
+        if self.idle_job is None and any(self.is_visible(view) for view in self.dirty):
+            self.idle_job = self.root.after_idle(self.flush)
+    
+    def flush(self, name=None):
+        """Repaint dirty visible views now, or just the named view even if hidden"""
+        if name is None:
+            self.idle_job = None
+            names = [view for view in self.dirty if self.is_visible(view)]
+        else:
+            names = [name]
+        
+        for view in names:
+            if view not in self.dirty:
+                continue
+            pending = self.dirty.pop(view)
+            refresh, refresh_items = self.views[view]
+            if pending is None:
+                refresh()
+            else:
+                refresh_items(pending)
+
+
+class VirtualBoardColumn:
+    """Kanban column canvas that only creates cards for the tasks in view"""
+    
+    CARD_HEIGHT = 64
+    CARD_GAP = 10
+    OVERSCAN = 3  # Extra cards drawn above and below the viewport
+    
+    def __init__(self, app, canvas, scrollbar):
+        self.app = app
+        self.canvas = canvas
+        self.task_ids = []
+        self.cards = []  # Pool of card widgets, reused while scrolling
+        
+        slot = self.CARD_HEIGHT + self.CARD_GAP
+        canvas.configure(yscrollcommand=scrollbar.set, yscrollincrement=slot)
+        scrollbar.configure(command=self.yview)
+        canvas.bind('<Configure>', lambda e: self.render())
+        self.bind_mousewheel(canvas)
+    
+    def set_task_ids(self, task_ids):
+        """Show a new list of task ids, in display order"""
+        self.task_ids = task_ids
+        self.render()
+    
+    def yview(self, *args):
+        """Scroll the column from its scrollbar"""
+        self.canvas.yview(*args)
+        self.render()
+    
+    def bind_mousewheel(self, widget):
+        widget.bind('<MouseWheel>', self.on_mousewheel)
+        widget.bind('<Button-4>', self.on_mousewheel)
+        widget.bind('<Button-5>', self.on_mousewheel)
+    
+    def on_mousewheel(self, event):
+        step = -1 if event.num == 4 or event.delta > 0 else 1
+        self.canvas.yview_scroll(step, 'units')
+        self.render()
+    
+    def render(self):
+        """Bind pooled cards to the tasks visible in the viewport"""
+        slot = self.CARD_HEIGHT + self.CARD_GAP
+        width = max(self.canvas.winfo_width(), 1)
+        self.canvas.configure(scrollregion=(0, 0, width, len(self.task_ids) * slot))
+        
+        top = self.canvas.canvasy(0)
+        first = max(0, int(top // slot) - self.OVERSCAN)
+        last = min(len(self.task_ids),
+                   int((top + self.canvas.winfo_height()) // slot) + 1 + self.OVERSCAN)
+        
+        while len(self.cards) < last - first:
+            self.cards.append(self.create_card())
+        
+        get = self.app.store.get
+        for i, card in enumerate(self.cards):
+            index = first + i
+            # A task removed since the column was last refreshed leaves a gap until then
+            task = get(self.task_ids[index]) if index < last else None
+            if task is not None:
+                self.bind_card(card, task)
+                self.canvas.coords(card['item'], 5, index * slot + self.CARD_GAP // 2)
+                self.canvas.itemconfigure(card['item'], state='normal', width=max(width - 10, 1))
+            else:
+                card['task_id'] = None
+                self.canvas.itemconfigure(card['item'], state='hidden')
+    
+    def create_card(self):
+        """Create an empty card widget for the pool"""
+        frame = ttk.Frame(self.canvas, style='Light.TFrame', borderwidth=1, relief='solid')
+        card = {'frame': frame, 'task_id': None, 'values': None,
+                'completed': tk.IntVar(value=0)}
+        
+        # Task title
+        title_frame = ttk.Frame(frame, style='Light.TFrame')
+        title_frame.pack(fill=tk.X, padx=5, pady=(5, 0))
+        
+        checkbox = ttk.Checkbutton(title_frame, style='Dark.TCheckbutton',
+                                 variable=card['completed'],
+                                 command=lambda: self.app.toggle_task_completion(card['task_id']))
+        checkbox.pack(side=tk.LEFT)
+        
+        card['title'] = ttk.Label(title_frame, style='Subtitle.TLabel')
+        card['title'].pack(side=tk.LEFT, padx=5)
+        
+        # Task details
+        details_frame = ttk.Frame(frame, style='Light.TFrame')
+        details_frame.pack(fill=tk.X, padx=5, pady=(0, 5))
+        
+        card['priority'] = ttk.Label(details_frame, style='Subtitle.TLabel')
+        card['priority'].pack(side=tk.LEFT)
+        card['category'] = ttk.Label(details_frame, style='Subtitle.TLabel')
+        card['category'].pack(side=tk.RIGHT)
+        
+        for widget in (frame, title_frame, card['title'], details_frame,
+                       card['priority'], card['category']):
+            self.bind_mousewheel(widget)
+        
+        card['item'] = self.canvas.create_window(0, 0, window=frame, anchor='nw',
+                                                 height=self.CARD_HEIGHT, state='hidden')
+        return card
+    
+    def bind_card(self, card, task):
+        """Show a task on a card, touching the widgets only if something changed"""
+        card['task_id'] = task['id']
+        values = (task['completed'], task['title'], task['priority'], task['category'])
+        if card['values'] == values:
+            return
+        
+        card['values'] = values
+        card['completed'].set(1 if task['completed'] else 0)
+        card['title'].config(text=task['title'])
+        card['priority'].config(text=task['priority'])
+        card['category'].config(text=task['category'])
+
+
+class VirtualTaskList:
+    """List view Treeview that only holds the rows in view, paged in from the full list
+    
+    The full list is kept as sorted keys ending with the task id; a pool of rows shows
+    the page at the scroll offset. Selection is kept by task id, so it survives paging.
+    """
+    
+    OVERSCAN = 2  # Extra rows filled below the visible ones
+    SHIFT, CONTROL = 0x0001, 0x0004  # Event state bits
+    
+    def __init__(self, app, tree, scrollbar, row_height):
+        self.app = app
+        self.tree = tree
+        self.scrollbar = scrollbar
+        self.row_height = row_height
+        
+        self.keys = []        # Sort keys of all shown tasks, in display order
+        self.task_keys = {}   # Task id -> sort key
+        self.offset = 0       # Index of the first visible row
+        self.page_rows = 20   # Rows that fit in the widget
+        self.rows = []        # Pool of Treeview items, top to bottom
+        self.row_values = []  # (task id, values) shown in each row
+        self.selected = set()
+        self.rendering = False
+        
+        scrollbar.configure(command=self.yview)
+        tree.bind('<Configure>', self.on_resize)
+        tree.bind('<<TreeviewSelect>>', self.on_select)
+        tree.bind('<Button-1>', self.on_click)
+        for widget_event in ('<MouseWheel>', '<Button-4>', '<Button-5>'):
+            tree.bind(widget_event, self.on_mousewheel)
+        for key, move in (('<Up>', -1), ('<Down>', 1), ('<Prior>', 'page_up'),
+                          ('<Next>', 'page_down'), ('<Home>', 'home'), ('<End>', 'end')):
+            tree.bind(key, lambda e, move=move: self.move_selection(move) or 'break')
+        tree.bind('<Control-a>', lambda e: self.select_all() or 'break')
+    
+    # ==============================================
+    # Rows
+    # ==============================================
+    
+    def set_keys(self, keys):
+        """Show a new list, given the sorted keys of its tasks"""
+        self.keys = keys
+        self.task_keys = {key[-1]: key for key in keys}
+        self.selected = {task_id for task_id in self.selected if task_id in self.task_keys}
+        self.render()
+    
+    def update(self, task_id, key):
+        """Move a task's row to its new sort key, or remove it if the key is None
+        
+        The offset follows the rows above the page, so the page keeps showing the same rows.
+        """
+        old_key = self.task_keys.pop(task_id, None)
+        if old_key is not None:
+            index = bisect_left(self.keys, old_key)
+            del self.keys[index]
+            if index < self.offset:
+                self.offset -= 1
+        if key is None:
+            self.selected.discard(task_id)
+            return
+        index = bisect_left(self.keys, key)
+        self.keys.insert(index, key)
+        self.task_keys[task_id] = key
+        if index < self.offset:
+            self.offset += 1
+    
+    def render(self):
+        """Fill the row pool with the page at the scroll offset"""
+        total = len(self.keys)
+        self.offset = max(0, min(self.offset, total - self.page_rows))
+        # Tasks removed since the list was last refreshed are left out until then
+        get = self.app.store.get
+        tasks = (get(key[-1]) for key in self.keys[self.offset:self.offset + self.page_rows + self.OVERSCAN])
+        page = [task for task in tasks if task is not None]
+        
+        while len(self.rows) < len(page):
+            self.rows.append(self.tree.insert('', tk.END, iid=f"row{len(self.rows)}"))
+            self.row_values.append(None)
+        if len(self.rows) > len(page):
+            self.tree.delete(*self.rows[len(page):])
+            del self.rows[len(page):], self.row_values[len(page):]
+        
+        # Rows are only touched when what they show changed
+        for i, task in enumerate(page):
+            task_id = task['id']
+            values = self.app.task_row_values(task)
+            if self.row_values[i] != (task_id, values):
+                self.row_values[i] = (task_id, values)
+                self.tree.item(self.rows[i], values=values,
+                               tags=('completed',) if task['completed'] else ())
+        
+        selection = tuple(row for row, task in zip(self.rows, page) if task['id'] in self.selected)
+        if selection != self.tree.selection():
+            self.rendering = True
+            try:
+                self.tree.selection_set(selection)
+            finally:
+                self.rendering = False
+        
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self.page_rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+    
+    def page_ids(self):
+        """Get the ids of the tasks in the visible rows"""
+        return [task_id for task_id, _ in self.row_values]
+    
+    def index_of(self, task_id):
+        return bisect_left(self.keys, self.task_keys[task_id])
+    
+    # ==============================================
+    # Scrolling
+    # ==============================================
+    
+    def yview(self, *args):
+        """Scroll from the scrollbar: ('moveto', fraction) or ('scroll', count, 'units' or 'pages')"""
+        if args[0] == 'moveto':
+            self.offset = int(float(args[1]) * len(self.keys))
+        elif args[0] == 'scroll':
+            step = self.page_rows if args[2] == 'pages' else 1
+            self.offset += int(args[1]) * step
+        self.render()
+    
+    def on_mousewheel(self, event):
+        step = -1 if event.num == 4 or event.delta > 0 else 1
+        self.offset += step * 3
+        self.render()
+        return 'break'
+    
+    def on_resize(self, event):
+        # The heading takes about one row
+        self.page_rows = max(1, event.height // self.row_height - 1)
+        self.render()
+    
+    def scroll_to(self, index):
+        """Scroll just enough for a row to be visible"""
+        if index < self.offset:
+            self.offset = index
+        elif index >= self.offset + self.page_rows:
+            self.offset = index - self.page_rows + 1
+    
+    # ==============================================
+    # Selection
+    # ==============================================
+    
+    def on_click(self, event):
+        # A plain click selects one row, so drop the selection on other pages too
+        if not event.state & (self.SHIFT | self.CONTROL):
+            self.selected.clear()
+    
+    def on_select(self, event):
+        """Take over the selection made in the visible rows"""
+        if self.rendering:
+            return
+        page = self.page_ids()
+        selected_rows = set(self.tree.selection())
+        self.selected.difference_update(page)
+        self.selected.update(task_id for row, task_id in zip(self.rows, page) if row in selected_rows)
+        self.app.on_task_selected(event)
+    
+    def move_selection(self, move):
+        """Select the row above or below the focused one, a page away, or the first or last"""
+        if not self.keys:
+            return
+        focus = self.tree.focus()
+        page = self.page_ids()
+        if focus in self.rows[:len(page)]:
+            index = self.index_of(page[self.rows.index(focus)])
+        else:
+            index = self.offset
+        
+        if move == 'page_up':
+            index -= self.page_rows
+        elif move == 'page_down':
+            index += self.page_rows
+        elif move == 'home':
+            index = 0
+        elif move == 'end':
+            index = len(self.keys) - 1
+        else:
+            index += move
+        index = max(0, min(index, len(self.keys) - 1))
+        
+        self.selected = {self.keys[index][-1]}
+        self.scroll_to(index)
+        self.render()
+        self.tree.focus(self.rows[index - self.offset])
+        self.app.on_task_selected(None)
+    
+    def select_all(self):
+        self.selected = set(self.task_keys)
+        self.render()
+        self.app.on_task_selected(None)
+    
+    def selected_ids(self):
+        """Get the ids of the selected tasks, in display order"""
+        return sorted(self.selected, key=self.task_keys.__getitem__)
+    
+    def first_selected(self):
+        """Get the id of the selected task shown first, or None"""
+        if not self.selected:
+            return None
+        return min(self.selected, key=self.task_keys.__getitem__)
+
+
 class UltimateTodoApp:
     def __init__(self, root):
         self.root = root
@@ -31,20 +465,63 @@ class UltimateTodoApp:
         self.style.theme_use('clam')
         self.configure_styles()
         
-        # App data
-        self.tasks = []
-        self.categories = ['💼 Work', '🏠 Personal', '🎓 Study', '❤️ Health', '🛒 Shopping', '🎉 Fun']
-        self.priorities = ['🔥 Critical', '⚠️ High', '🔼 Medium', '🔽 Low', '🌱 Chill']
+        # App data; this empty store is replaced once the saved data has loaded
+        self.install_store(*self.build_store(None))
+        self.data_loaded = False
+        self.categories = list(DEFAULT_CATEGORIES)
+        self.priorities = list(DEFAULT_PRIORITIES)
         self.emoji_list = ['🌸', '✨', '💖', '🦋', '🍒', '🎀', '👑', '💄', '👠', '👜']
         
-        # Load saved data
-        self.load_data()
+        # Active list view filter, a task predicate or None for all tasks, and optionally
+        # a query getting the ids of the matching tasks without testing every task
+        self.list_filter = None
+        self.list_query = None
         
-        # Setup UI
+        # Active sidebar filters: (group, value) -> True to show, False to hide the matches
+        self.filter_toggles = {}
+        self.due_range = (None, None)  # Dates of the custom range filter, either may be open
+        
+        # List view order; install_store() keeps an order index per order shown so far
+        self.list_order = 'default'
+        
+        # Task id -> rank while search results are shown, ordering the list view
+        self.search_rank = None
+        self.search_job = None
+        
+        # Saved data storage
+        if STORAGE_BACKEND == 'sqlite':
+            self.storage = SQLiteStorage()
+        elif STORAGE_BACKEND == 'snapshot':
+            self.storage = JsonStorage()
+        else:
+            self.storage = JournalStorage()
+        
+        # Autosave state: changes not handed to storage yet, and the pending save
+        self.unsaved_changes = False
+        self.autosave_job = None
+        self.save_check_job = None
+        
+        # Timing of the hot paths, wrapped before anything holds on to the methods
+        self.profiler = None
+        if PROFILE:
+            self.instrument_hot_paths()
+        
+        # Views follow store changes, repainted when idle
+        self.render_scheduler = RenderScheduler(self.root, self.is_view_visible)
+        self.render_scheduler.register('list', self.update_task_list, self.refresh_list_rows)
+        self.render_scheduler.register('board', self.update_board_view, self.refresh_board_cards)
+        self.render_scheduler.register('calendar', self.update_calendar_view, self.refresh_calendar_days)
+        self.render_scheduler.register('progress', self.update_progress_view)
+        self.render_scheduler.register('status', self.update_status_bar)
+        self.render_scheduler.register('sidebar', self.update_sidebar_stats)
+        
+        # Setup UI; only the list view tab is built before it is first selected
         self.setup_ui()
+        self.store.subscribe(self.on_store_changed)
+        self.update_all_views()
         
-        # Start with a motivational quote
-        self.show_daily_quote()
+        # Load saved data, then greet with a motivational quote
+        self.load_data()
         
     def configure_styles(self):
         """Configure all widget styles"""
@@ -114,7 +591,7 @@ class UltimateTodoApp:
                            foreground=self.colors['text'],
                            fieldbackground=self.colors['light_bg'],
                            borderwidth=0,
-                           rowheight=25)
+                           rowheight=LIST_ROW_HEIGHT)
         
         self.style.configure('Custom.Treeview.Heading',
                            background=self.colors['accent_dark'],
@@ -254,48 +731,65 @@ class UltimateTodoApp:
                                      command=lambda: self.filter_tasks('all'))
         self.view_all_btn.pack(fill=tk.X, pady=2)
         
-        self.view_today_btn = ttk.Button(nav_frame, text="📅 Today's Tasks", 
-                                       style='Secondary.TButton',
-                                       command=lambda: self.filter_tasks('today'))
-        self.view_today_btn.pack(fill=tk.X, pady=2)
+        # The other buttons are toggles: click to show only matching tasks, Shift+click to
+        # hide them. Toggles in one group are combined with OR, the groups with AND.
+        self.filter_buttons = {}  # (group, value) -> (button, text)
+        self.view_today_btn = self.add_filter_button(nav_frame, "📅 Today's Tasks", 'due', 'today')
+        self.view_upcoming_btn = self.add_filter_button(nav_frame, "⏳ Upcoming", 'due', 'upcoming')
+        self.view_week_btn = self.add_filter_button(nav_frame, "🗓️ This Week", 'due', 'week')
+        self.view_overdue_btn = self.add_filter_button(nav_frame, "⏰ Overdue", 'due', 'overdue')
+        self.view_range_btn = self.add_filter_button(nav_frame, "📆 Date Range...", 'due', 'range')
+        self.view_completed_btn = self.add_filter_button(nav_frame, "✅ Completed", 'state', 'completed')
         
-        self.view_upcoming_btn = ttk.Button(nav_frame, text="⏳ Upcoming", 
-                                          style='Secondary.TButton',
-                                          command=lambda: self.filter_tasks('upcoming'))
-        self.view_upcoming_btn.pack(fill=tk.X, pady=2)
+        # Categories filter
+        self.category_frame = ttk.Frame(sidebar_frame, style='Light.TFrame')
+        self.category_frame.pack(fill=tk.X, pady=(10, 0))
         
-        self.view_completed_btn = ttk.Button(nav_frame, text="✅ Completed", 
-                                           style='Secondary.TButton',
-                                           command=lambda: self.filter_tasks('completed'))
-        self.view_completed_btn.pack(fill=tk.X, pady=2)
+        ttk.Label(self.category_frame, text="🏷️ Categories", style='Subtitle.TLabel').pack(anchor=tk.W, pady=5)
         
-        # Categories filter
-        cat_frame = ttk.Frame(sidebar_frame, style='Light.TFrame')
-        cat_frame.pack(fill=tk.X, pady=(10, 0))
+        # Priority filter
+        self.priority_frame = ttk.Frame(sidebar_frame, style='Light.TFrame')
+        self.priority_frame.pack(fill=tk.X, pady=(10, 0))
         
-        ttk.Label(cat_frame, text="🏷️ Categories", style='Subtitle.TLabel').pack(anchor=tk.W, pady=5)
+        ttk.Label(self.priority_frame, text="🚨 Priority", style='Subtitle.TLabel').pack(anchor=tk.W, pady=5)
         
-        self.category_buttons = []
-        for category in self.categories:
-            btn = ttk.Button(cat_frame, text=category, 
-                            style='Secondary.TButton',
-                            command=lambda c=category: self.filter_tasks('category', c))
-            btn.pack(fill=tk.X, pady=2)
-            self.category_buttons.append(btn)
+        # Rebuilt once the saved categories and priorities are loaded
+        self.category_buttons, self.priority_buttons = [], []
+        self.build_group_filter_buttons()
         
-        # Priority filter
-        prio_frame = ttk.Frame(sidebar_frame, style='Light.TFrame')
-        prio_frame.pack(fill=tk.X, pady=(10, 0))
+        # Live statistics
+        stats_frame = ttk.Frame(sidebar_frame, style='Light.TFrame')
+        stats_frame.pack(fill=tk.X, pady=(10, 0))
         
-        ttk.Label(prio_frame, text="🚨 Priority", style='Subtitle.TLabel').pack(anchor=tk.W, pady=5)
+        ttk.Label(stats_frame, text="📈 Live Stats", style='Subtitle.TLabel').pack(anchor=tk.W, pady=5)
         
-        self.priority_buttons = []
-        for priority in self.priorities:
-            btn = ttk.Button(prio_frame, text=priority, 
-                            style='Secondary.TButton',
-                            command=lambda p=priority: self.filter_tasks('priority', p))
-            btn.pack(fill=tk.X, pady=2)
-            self.priority_buttons.append(btn)
+        self.sidebar_stats_label = ttk.Label(stats_frame, text="", style='Subtitle.TLabel',
+                                           justify=tk.LEFT)
+        self.sidebar_stats_label.pack(anchor=tk.W, padx=5)
+        
+        self.update_sidebar_stats()
+    
+    def build_group_filter_buttons(self):
+        """Build the category and priority toggles for the current categories and priorities"""
+        for button in self.category_buttons + self.priority_buttons:
+            button.destroy()
+        for key in [key for key in self.filter_buttons if key[0] in ('category', 'priority')]:
+            del self.filter_buttons[key]
+        
+        self.category_buttons = [self.add_filter_button(self.category_frame, category, 'category', category)
+                                 for category in self.categories]
+        self.priority_buttons = [self.add_filter_button(self.priority_frame, priority, 'priority', priority)
+                                 for priority in self.priorities]
+    
+    def add_filter_button(self, parent, text, group, value):
+        """Add a sidebar toggle for one filter"""
+        button = ttk.Button(parent, text=text, style='Secondary.TButton',
+                            command=lambda: self.toggle_filter(group, value))
+        button.bind('<Shift-Button-1>',
+                    lambda e: self.toggle_filter(group, value, exclude=True) or 'break')
+        button.pack(fill=tk.X, pady=2)
+        self.filter_buttons[(group, value)] = (button, text)
+        return button
     
     def setup_task_area(self):
         """Set up the main task display and management area"""
@@ -307,6 +801,8 @@ class UltimateTodoApp:
         
         self.search_entry = ttk.Entry(self.search_frame, style='Dark.TEntry')
         self.search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5, pady=5)
+        self.search_entry.bind('<KeyRelease>', lambda e: self.schedule_search())
+        self.search_entry.bind('<Return>', lambda e: self.perform_search())
         
         search_btn = ttk.Button(self.search_frame, text="🔍 Search", 
                               style='Accent.TButton',
@@ -353,8 +849,6 @@ class UltimateTodoApp:
         self.list_view_frame = ttk.Frame(self.notebook, style='Light.TFrame')
         self.notebook.add(self.list_view_frame, text="📋 List View")
         
-        self.setup_list_view()
-        
         # Board view tab
         self.board_view_frame = ttk.Frame(self.notebook, style='Light.TFrame')
         self.notebook.add(self.board_view_frame, text="📌 Board View")
@@ -367,10 +861,22 @@ class UltimateTodoApp:
         self.progress_frame = ttk.Frame(self.notebook, style='Light.TFrame')
         self.notebook.add(self.progress_frame, text="📊 Progress")
         
-        # Set up all views
-        self.setup_board_view()
-        self.setup_calendar_view()
-        self.setup_progress_view()
+        self.view_frames = {
+            'list': self.list_view_frame,
+            'board': self.board_view_frame,
+            'calendar': self.calendar_view_frame,
+            'progress': self.progress_frame
+        }
+        
+        # The other tabs are built the first time they are selected
+        self.view_setups = {
+            'board': self.setup_board_view,
+            'calendar': self.setup_calendar_view,
+            'progress': self.setup_progress_view
+        }
+        self.built_views = {'list'}
+        self.activity_backlog = []  # Log lines written before the progress tab was built
+        self.setup_list_view()
         
         # Bind notebook tab change
         self.notebook.bind("<<NotebookTabChanged>>", self.on_tab_changed)
@@ -379,8 +885,9 @@ class UltimateTodoApp:
         """Set up the list view of tasks"""
         # Treeview for tasks
         self.tree = ttk.Treeview(self.list_view_frame, style='Custom.Treeview',
-                                columns=('id', 'completed', 'title', 'due_date', 'priority', 'category'),
-                                show='headings', selectmode='browse')
+                                columns=('id', 'completed', 'title', 'due_date', 'priority', 'category',
+                                         'created_at'),
+                                show='headings', selectmode='extended')
         
         # Configure columns
         self.tree.column('id', width=0, stretch=tk.NO)  # Hidden ID column
@@ -389,31 +896,29 @@ class UltimateTodoApp:
         self.tree.column('due_date', width=120, anchor=tk.CENTER)
         self.tree.column('priority', width=120, anchor=tk.CENTER)
         self.tree.column('category', width=120, anchor=tk.CENTER)
+        self.tree.column('created_at', width=130, anchor=tk.CENTER)
         
-        # Configure headings
-        self.tree.heading('completed', text='✓')
-        self.tree.heading('title', text='Task')
-        self.tree.heading('due_date', text='Due Date')
-        self.tree.heading('priority', text='Priority')
-        self.tree.heading('category', text='Category')
+        # Configure headings; clicking one shows the tasks in that column's order
+        for column, heading in LIST_HEADINGS.items():
+            self.tree.heading(column, text=heading,
+                              command=lambda order=LIST_COLUMN_ORDERS[column]: self.set_list_order(order))
         
-        # Add scrollbar
-        scrollbar = ttk.Scrollbar(self.list_view_frame, style='Dark.Vertical.TScrollbar',
-                                 command=self.tree.yview)
-        self.tree.configure(yscrollcommand=scrollbar.set)
+        # Add scrollbar; the task list sets it for the whole list, not the rows in the tree
+        scrollbar = ttk.Scrollbar(self.list_view_frame, style='Dark.Vertical.TScrollbar')
         
         # Pack widgets
         self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
         
-        # Bind selection event
-        self.tree.bind('<<TreeviewSelect>>', self.on_task_selected)
+        # Style completed tasks differently
+        self.tree.tag_configure('completed', foreground=self.colors['completed'])
+        
+        # Only the rows in view are in the tree; it also keeps the selection and
+        # handles Ctrl/Shift+click and Ctrl+A for bulk actions
+        self.task_list = VirtualTaskList(self, self.tree, scrollbar, LIST_ROW_HEIGHT)
         
         # Double click to edit
         self.tree.bind('<Double-1>', lambda e: self.edit_selected_task())
-        
-        # Populate with tasks
-        self.update_task_list()
     
     def setup_board_view(self):
         """Set up the kanban-style board view"""
@@ -425,7 +930,8 @@ class UltimateTodoApp:
         ]
         
         self.board_frames = {}
-        self.board_lists = {}
+        self.board_lists = {}   # Status -> sorted ids of the tasks in that column
+        self.board_status = {}  # Task id -> column it is shown in
         
         # Create a frame for each column
         for col in board_columns:
@@ -442,21 +948,10 @@ class UltimateTodoApp:
             count_label = ttk.Label(header, text="0", style='Subtitle.TLabel')
             count_label.pack(side=tk.RIGHT, padx=5, pady=5)
             
-            # Task list
+            # Task list, drawing only the cards in view
             canvas = tk.Canvas(frame, bg=self.colors['light_bg'], highlightthickness=0)
-            scrollbar = ttk.Scrollbar(frame, style='Dark.Vertical.TScrollbar',
-                                    command=canvas.yview)
-            
-            task_frame = ttk.Frame(canvas, style='Light.TFrame')
-            task_frame.bind(
-                "<Configure>",
-                lambda e, canvas=canvas: canvas.configure(
-                    scrollregion=canvas.bbox("all")
-                )
-            )
-            
-            canvas.create_window((0, 0), window=task_frame, anchor="nw")
-            canvas.configure(yscrollcommand=scrollbar.set)
+            scrollbar = ttk.Scrollbar(frame, style='Dark.Vertical.TScrollbar')
+            column = VirtualBoardColumn(self, canvas, scrollbar)
             
             canvas.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
             scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
@@ -464,13 +959,11 @@ class UltimateTodoApp:
             # Store references
             self.board_frames[col['id']] = {
                 'frame': frame,
-                'task_frame': task_frame,
+                'canvas': canvas,
+                'column': column,
                 'count_label': count_label
             }
             self.board_lists[col['id']] = []
-        
-        # Update board view
-        self.update_board_view()
     
     def setup_calendar_view(self):
         """Set up the calendar view of tasks"""
@@ -495,9 +988,45 @@ class UltimateTodoApp:
         self.calendar_frame = ttk.Frame(self.calendar_view_frame, style='Light.TFrame')
         self.calendar_frame.pack(fill=tk.BOTH, expand=True)
         
+        # Day headers and the 6x7 day cells are built once and reused for every month
+        headers = ['Sun', 'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat']
+        for i, header in enumerate(headers):
+            label = ttk.Label(self.calendar_frame, text=header, style='Subtitle.TLabel',
+                            width=10, anchor=tk.CENTER)
+            label.grid(row=0, column=i, padx=2, pady=2)
+        
+        self.calendar_grid = []
+        for row in range(1, 7):
+            for col in range(7):
+                day_frame = ttk.Frame(self.calendar_frame, style='Light.TFrame',
+                                    width=100, height=80)
+                day_frame.grid(row=row, column=col, padx=2, pady=2, sticky='nsew')
+                
+                day_label = ttk.Label(day_frame, style='Subtitle.TLabel')
+                day_label.pack(anchor=tk.NW, padx=5, pady=5)
+                
+                count_label = ttk.Label(day_frame, style='Subtitle.TLabel')
+                count_label.pack(anchor=tk.SW, padx=5, pady=5)
+                
+                self.calendar_grid.append({
+                    'frame': day_frame,
+                    'day_label': day_label,
+                    'count_label': count_label,
+                    'model': False  # Nothing shown yet
+                })
+        
+        # Configure grid weights
+        for col in range(7):
+            self.calendar_frame.grid_columnconfigure(col, weight=1)
+        for row in range(1, 7):
+            self.calendar_frame.grid_rowconfigure(row, weight=1)
+        
+        # (year, month) -> cell models, kept until the tasks due that month change
+        self.calendar_models = {}
+        self.calendar_precompute_job = None
+        
         # Initialize with current month
         self.current_date = datetime.now()
-        self.update_calendar_view()
     
     def setup_progress_view(self):
         """Set up the progress tracking view"""
@@ -541,10 +1070,10 @@ class UltimateTodoApp:
                                                     wrap=tk.WORD,
                                                     font=('Segoe UI', 9))
         self.activity_log.pack(fill=tk.BOTH, expand=True, pady=5)
+        self.activity_log.insert(tk.END, ''.join(self.activity_backlog))
         self.activity_log.configure(state='disabled')
-        
-        # Update progress view
-        self.update_progress_view()
+        self.activity_log.see(tk.END)
+        self.activity_backlog = []
     
     def setup_status_bar(self):
         """Set up the status bar at the bottom"""
@@ -563,8 +1092,16 @@ class UltimateTodoApp:
         self.version_label = ttk.Label(self.status_bar, text="Empress To-Do v1.0", style='Subtitle.TLabel')
         self.version_label.pack(side=tk.RIGHT, padx=10)
         
-        # Update status bar
-        self.update_status_bar()
+        # Passing messages like the daily quote, which don't need a modal dialog
+        self.message_label = ttk.Label(self.status_bar, text="", style='Subtitle.TLabel')
+        self.message_label.pack(side=tk.RIGHT, padx=10)
+        self.message_job = None
+        
+        # Performance overlay, only when profiling
+        if self.profiler is not None:
+            self.perf_label = ttk.Label(self.status_bar, text="", style='Subtitle.TLabel')
+            self.perf_label.pack(side=tk.RIGHT, padx=10)
+            self.root.after(PERF_OVERLAY_MS, self.update_perf_overlay)
     
     def apply_custom_fonts(self):
         """Apply custom fonts to specific widgets"""
@@ -581,6 +1118,9 @@ class UltimateTodoApp:
         self.root.bind('<Control-f>', lambda e: self.toggle_search())
         self.root.bind('<Delete>', lambda e: self.delete_selected_task())
         self.root.bind('<Control-s>', lambda e: self.save_data())
+        if self.profiler is not None:
+            self.root.bind('<Control-P>', lambda e: self.toggle_perf_overlay())
+            self.root.bind('<Control-T>', lambda e: self.export_trace())
     
     # ==============================================
     # Task Management Methods
@@ -588,248 +1128,460 @@ class UltimateTodoApp:
     
     def add_task(self, title, description="", due_date=None, priority="🔼 Medium", category="💼 Work"):
         """Add a new task to the list"""
-        task_id = len(self.tasks) + 1
-        completed = False
-        created_at = datetime.now().strftime("%Y-%m-%d %H:%M")
-        
-        task = {
-            'id': task_id,
-            'title': title,
-            'description': description,
-            'due_date': due_date,
-            'priority': priority,
-            'category': category,
-            'completed': completed,
-            'created_at': created_at,
-            'completed_at': None,
-            'status': 'todo'
-        }
-        
-        self.tasks.append(task)
-        self.update_all_views()
+        task = self.store.add(title, description, due_date, priority, category)
         self.log_activity(f"Added task: {title}")
         
-        return task_id
+        return task['id']
     
     def edit_task(self, task_id, **kwargs):
         """Edit an existing task"""
-        task = next((t for t in self.tasks if t['id'] == task_id), None)
+        task = self.store.update(task_id, **kwargs)
         if task:
-            for key, value in kwargs.items():
-                if key in task and key != 'id':  # Don't allow changing the ID
-                    task[key] = value
-            
-            self.update_all_views()
             self.log_activity(f"Updated task: {task['title']}")
             return True
         return False
     
     def delete_task(self, task_id):
         """Delete a task from the list"""
-        task = next((t for t in self.tasks if t['id'] == task_id), None)
+        task = self.store.remove(task_id)
         if task:
-            self.tasks.remove(task)
-            self.update_all_views()
             self.log_activity(f"Deleted task: {task['title']}")
             return True
         return False
     
     def toggle_task_completion(self, task_id=None):
-        """Toggle completion status of a task"""
+        """Toggle completion status of a task; with several tasks selected, of all of them"""
         if task_id is None:
-            selected = self.get_selected_task()
+            selected = self.get_selected_tasks()
+            if len(selected) > 1:
+                # Undo only when all are done, like the button says
+                completed = not all(task['completed'] for task in selected)
+                self.set_tasks_completed([task['id'] for task in selected], completed)
+                return True
             if selected:
-                task_id = selected['id']
+                task_id = selected[0]['id']
         
-        task = next((t for t in self.tasks if t['id'] == task_id), None)
+        task = self.store.get(task_id)
         if task:
-            task['completed'] = not task['completed']
-            task['completed_at'] = datetime.now().strftime("%Y-%m-%d %H:%M") if task['completed'] else None
-            task['status'] = 'done' if task['completed'] else 'todo'
+            completed = not task['completed']
+            task = self.store.update(
+                task_id,
+                completed=completed,
+                completed_at=datetime.now().strftime("%Y-%m-%d %H:%M") if completed else None,
+                status='done' if completed else 'todo'
+            )
             
-            self.update_all_views()
             action = "Completed" if task['completed'] else "Marked incomplete"
             self.log_activity(f"{action} task: {task['title']}")
             return True
         return False
     
     def get_selected_task(self):
-        """Get the currently selected task"""
+        """Get the currently selected task, the first one if several are selected"""
         if self.notebook.index(self.notebook.select()) == 0:  # List view
-            selected = self.tree.selection()
-            if selected:
-                item = self.tree.item(selected[0])
-                task_id = int(item['values'][0])
-                return next((t for t in self.tasks if t['id'] == task_id), None)
+            task_id = self.task_list.first_selected()
+            if task_id is not None:
+                return self.store.get(task_id)
         return None
     
+    def get_selected_tasks(self):
+        """Get all selected tasks, in list order"""
+        if self.notebook.index(self.notebook.select()) != 0:  # List view
+            return []
+        tasks = (self.store.get(task_id) for task_id in self.task_list.selected_ids())
+        return [task for task in tasks if task is not None]
+    
+    # ==============================================
+    # Bulk Actions
+    # ==============================================
+    
+    def bulk_update(self, task_ids, action, **fields):
+        """Change fields of many tasks as one store change, logged once
+        
+        A status of 'done' also completes a task and any other status reopens it,
+        as toggling a single task does.
+        """
+        now = datetime.now().strftime("%Y-%m-%d %H:%M")
+        count = 0
+        with self.store.batch():
+            for task_id in task_ids:
+                task = self.store.get(task_id)
+                if task is None:
+                    continue
+                changes = fields
+                if 'status' in fields and (fields['status'] == 'done') != task['completed']:
+                    completed = fields['status'] == 'done'
+                    changes = dict(fields, completed=completed, completed_at=now if completed else None)
+                self.store.update(task_id, **changes)
+                count += 1
+        self.log_activity(f"{action} {count} tasks")
+        return count
+    
+    def set_tasks_completed(self, task_ids, completed):
+        """Complete or reopen many tasks; tasks already in that state are left as they are"""
+        task_ids = [task_id for task_id in task_ids
+                    if task_id in self.store and self.store.get(task_id)['completed'] != completed]
+        return self.bulk_update(task_ids, "Completed" if completed else "Reopened",
+                                status='done' if completed else 'todo')
+    
+    def delete_tasks(self, task_ids):
+        """Delete many tasks as one store change, logged once"""
+        with self.store.batch():
+            count = sum(self.store.remove(task_id) is not None for task_id in task_ids)
+        self.log_activity(f"Deleted {count} tasks")
+        return count
+    
+    def open_bulk_edit_dialog(self, tasks):
+        """Change the priority, category, status or due date of several tasks at once"""
+        dialog = tk.Toplevel(self.root)
+        dialog.title(f"✏️ Edit {len(tasks)} Tasks")
+        dialog.geometry("400x420")
+        dialog.resizable(False, False)
+        dialog.transient(self.root)
+        dialog.grab_set()
+        dialog.configure(bg=self.colors['dark_bg'])
+        
+        ttk.Label(dialog, text=f"✏️ Edit {len(tasks)} Tasks", style='Title.TLabel').pack(pady=10)
+        
+        form_frame = ttk.Frame(dialog, style='Light.TFrame')
+        form_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        
+        unchanged = "(unchanged)"
+        combos = {}
+        for field, label, values in (('priority', "Priority:", self.priorities),
+                                     ('category', "Category:", self.categories),
+                                     ('status', "Status:", ['todo', 'in_progress', 'done'])):
+            ttk.Label(form_frame, text=label, style='Subtitle.TLabel').pack(anchor=tk.W, pady=(5, 0))
+            combo = ttk.Combobox(form_frame, values=[unchanged] + list(values), state='readonly',
+                                 style='Dark.TCombobox')
+            combo.set(unchanged)
+            combo.pack(fill=tk.X, padx=5, pady=5)
+            combos[field] = combo
+        
+        ttk.Label(form_frame, text="Due Date (YYYY-MM-DD, empty to leave unchanged):",
+                  style='Subtitle.TLabel').pack(anchor=tk.W, pady=(5, 0))
+        due_frame = ttk.Frame(form_frame, style='Light.TFrame')
+        due_frame.pack(fill=tk.X, padx=5, pady=5)
+        due_entry = ttk.Entry(due_frame, style='Dark.TEntry')
+        due_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        ttk.Button(due_frame, text="📅", width=3, style='Secondary.TButton',
+                   command=lambda: self.show_calendar(due_entry)).pack(side=tk.RIGHT, padx=(5, 0))
+        clear_due_var = tk.BooleanVar(value=False)
+        ttk.Checkbutton(form_frame, text="Remove the due date", variable=clear_due_var,
+                        style='Dark.TCheckbutton').pack(anchor=tk.W, padx=5)
+        
+        def apply():
+            fields = {field: combo.get() for field, combo in combos.items() if combo.get() != unchanged}
+            due_date = due_entry.get().strip()
+            if clear_due_var.get():
+                fields['due_date'] = None
+            elif due_date:
+                try:
+                    datetime.strptime(due_date, "%Y-%m-%d")
+                except ValueError:
+                    messagebox.showwarning("Warning", "Due date must be in YYYY-MM-DD format!",
+                                           parent=dialog)
+                    return
+                fields['due_date'] = due_date
+            
+            dialog.destroy()
+            if fields:
+                self.bulk_update([task['id'] for task in tasks], "Edited", **fields)
+        
+        button_frame = ttk.Frame(form_frame, style='Light.TFrame')
+        button_frame.pack(fill=tk.X, pady=10)
+        ttk.Button(button_frame, text="Cancel", style='Secondary.TButton',
+                   command=dialog.destroy).pack(side=tk.LEFT, padx=5, expand=True)
+        ttk.Button(button_frame, text="Apply", style='Accent.TButton',
+                   command=apply).pack(side=tk.RIGHT, padx=5, expand=True)
+    
     # ==============================================
     # UI Update Methods
     # ==============================================
     
     def update_all_views(self):
-        """Update all task views"""
-        self.update_task_list()
-        self.update_board_view()
-        self.update_calendar_view()
-        self.update_progress_view()
-        self.update_status_bar()
+        """Schedule a refresh of all task views"""
+        self.render_scheduler.invalidate()
     
-    def update_task_list(self, tasks=None):
-        """Update the list view with tasks"""
-        if tasks is None:
-            tasks = self.tasks
-        
-        # Clear current items
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-        
-        # Add tasks to the treeview
-        for task in sorted(tasks, key=lambda x: (
-            x['completed'], 
-            self.priorities.index(x['priority']) if x['priority'] in self.priorities else len(self.priorities),
-            x['due_date'] or '9999-12-31'
-        )):
-            completed = "✓" if task['completed'] else ""
-            due_date = task['due_date'] if task['due_date'] else ""
-            
-            values = (
-                task['id'],
-                completed,
-                task['title'],
-                due_date,
-                task['priority'],
-                task['category']
-            )
-            
-            item = self.tree.insert('', tk.END, values=values)
+    def is_view_visible(self, name):
+        """Check whether a view is on screen; views outside the notebook always are"""
+        tab = self.view_frames.get(name)
+        return tab is None or (name in self.built_views and self.notebook.select() == str(tab))
+    
+    def show_message(self, text, duration_ms=8000):
+        """Show a passing message in the status bar"""
+        if self.message_job is not None:
+            self.root.after_cancel(self.message_job)
+        self.message_label.config(text=text)
+        self.message_job = self.root.after(duration_ms, lambda: self.message_label.config(text=""))
+    
+    def on_store_changed(self, changes):
+        """Mark the parts of each view affected by store changes as dirty"""
+        self.request_autosave()
+        
+        if any(change.kind == TaskChange.RESET for change in changes):
+            self.update_all_views()
+            return
+        
+        scheduler = self.render_scheduler
+        scheduler.mark('list', {change.task_id for change in changes})
+        scheduler.mark('board', {
+            change.task_id for change in changes
+            if change.touches('status', 'title', 'priority', 'category', 'completed')
+        })
+        
+        days = set()
+        for change in changes:
+            if change.touches('due_date', 'priority', 'completed'):
+                days.update((change.before('due_date'), change.after('due_date')))
+        days.discard(None)
+        scheduler.mark('calendar', days)
+        
+        if any(change.touches('completed', 'priority') for change in changes):
+            scheduler.invalidate('progress')
+        if any(change.touches('completed', 'title') for change in changes):
+            scheduler.invalidate('status')
+        if any(change.touches('completed', 'status', 'due_date') for change in changes):
+            scheduler.invalidate('sidebar')
+        
+        # Search results follow edits to the searched text
+        if self.search_rank is not None and any(
+                change.touches('title', 'description') for change in changes):
+            self.schedule_search()
+    
+    @staticmethod
+    def list_order_key(name, priorities, categories):
+        """Get the sort key of a list view order and the task fields it depends on"""
+        if name == 'title':
+            return (lambda task: (task.title.casefold(), task.id)), ('title',)
+        if name == 'due_date':
+            return (lambda task: (task.due_date or '9999-12-31', task.id)), ('due_date',)
+        if name == 'category':
+            category_rank = {CATEGORY_CODES.code(category): i
+                             for i, category in enumerate(categories)}
+            return (lambda task: (category_rank.get(task.category_code, len(category_rank)),
+                                  task.id)), ('category',)
+        if name == 'created_at':
+            # Newest first; created_at values that are not timestamps go last
+            return (lambda task: (0, -task.created_ts, task.id) if type(task.created_ts) is int
+                    else (1, 0, task.id)), ('created_at',)
+        
+        priority_rank = {PRIORITY_CODES.code(priority): i
+                         for i, priority in enumerate(priorities)}
+        return (lambda task: (task.completed,
+                              priority_rank.get(task.priority_code, len(priority_rank)),
+                              task.due_date or '9999-12-31',
+                              task.id)), ('completed', 'priority', 'due_date')
+    
+    def order_index(self):
+        """Get the index keeping the tasks in the current list view order, built on first use"""
+        order = self.list_orders.get(self.list_order)
+        if order is None:
+            order = self.store.add_index(OrderIndex(
+                *self.list_order_key(self.list_order, self.priorities, self.categories)))
+            self.list_orders[self.list_order] = order
+        return order
+    
+    def reset_list_orders(self):
+        """Drop the order indexes, after the priority or category ranking changed"""
+        for order in self.list_orders.values():
+            self.store.remove_index(order)
+        self.list_orders = {}
+    
+    def set_list_order(self, name):
+        """Show the list view in another order"""
+        if name == self.list_order:
+            return
+        self.list_order = name
+        for column, heading in LIST_HEADINGS.items():
+            marker = ' ▴' if LIST_COLUMN_ORDERS[column] == name and column != 'completed' else ''
+            self.tree.heading(column, text=heading + marker)
+        self.render_scheduler.invalidate('list')
+    
+    def task_sort_key(self, task):
+        """Get the list view sort key of a task"""
+        if self.search_rank is not None:
+            return (self.search_rank.get(task.id, len(self.search_rank)), task.id)
+        return self.order_index().key(task)
+    
+    def update_task_list(self):
+        """Update the list view with the tasks matching the current filter"""
+        if self.search_rank is not None:
+            # Search results come best first already
+            rank = self.search_rank
+            keys = [(rank[task_id], task_id) for task_id in self.filtered_task_ids()]
+        else:
+            # Read off the order index, no sorting
+            order = self.order_index()
+            task_keys = order.task_keys
+            keys = [task_keys[task_id] for task_id in order.ordered(self.filtered_task_ids())]
+        
+        # Only the page in view is put in the tree
+        self.task_list.set_keys(keys)
+    
+    def filtered_task_ids(self):
+        """Get the ids of the tasks matching the current list view filter, or None for all"""
+        if self.list_query is not None:
+            store = self.store
+            # Search results may still name tasks deleted since
+            return [task_id for task_id in self.list_query() if task_id in store]
+        if self.list_filter is None:
+            return None
+        return [task['id'] for task in self.store if self.list_filter(task)]
+    
+    def set_list_filter(self, predicate, query=None):
+        """Set the list view filter; the query must select the same tasks as the predicate"""
+        self.list_filter = predicate
+        self.list_query = query
+        self.render_scheduler.invalidate('list')
+    
+    def refresh_list_rows(self, task_ids):
+        """Update only the list view rows of the given tasks"""
+        task_list = self.task_list
+        for task_id in task_ids:
+            task = self.store.get(task_id)
+            shown = task is not None and (self.list_filter is None or self.list_filter(task))
             
-            # Style completed tasks differently
-            if task['completed']:
-                self.tree.item(item, tags=('completed',))
-                self.tree.tag_configure('completed', foreground=self.colors['completed'])
+            task_list.update(task_id, self.task_sort_key(task) if shown else None)
+        task_list.render()
+    
+    def task_row_values(self, task):
+        """Get the list view column values for a task"""
+        return (
+            task['id'],
+            "✓" if task['completed'] else "",
+            task['title'],
+            task['due_date'] if task['due_date'] else "",
+            task['priority'],
+            task['category'],
+            task['created_at'] or ""
+        )
     
     def update_board_view(self):
         """Update the kanban board view"""
-        # Clear all task frames
-        for col in self.board_frames.values():
-            for widget in col['task_frame'].winfo_children():
-                widget.destroy()
-            col['count_label'].config(text="0")
-        
-        # Add tasks to appropriate columns
-        for task in self.tasks:
-            status = task['status']
-            if status in self.board_frames:
-                frame = self.board_frames[status]['task_frame']
-                count_label = self.board_frames[status]['count_label']
-                
-                # Create task card
-                card = ttk.Frame(frame, style='Light.TFrame', borderwidth=1, relief='solid')
-                card.pack(fill=tk.X, padx=5, pady=5)
-                
-                # Task title
-                title_frame = ttk.Frame(card, style='Light.TFrame')
-                title_frame.pack(fill=tk.X, padx=5, pady=(5, 0))
-                
-                checkbox = ttk.Checkbutton(title_frame, style='Dark.TCheckbutton',
-                                         variable=tk.IntVar(value=1 if task['completed'] else 0),
-                                         command=lambda t=task: self.toggle_task_completion(t['id']))
-                checkbox.pack(side=tk.LEFT)
-                
-                title = ttk.Label(title_frame, text=task['title'], style='Subtitle.TLabel')
-                title.pack(side=tk.LEFT, padx=5)
-                
-                # Task details
-                details_frame = ttk.Frame(card, style='Light.TFrame')
-                details_frame.pack(fill=tk.X, padx=5, pady=(0, 5))
-                
-                ttk.Label(details_frame, text=task['priority'], style='Subtitle.TLabel').pack(side=tk.LEFT)
-                ttk.Label(details_frame, text=task['category'], style='Subtitle.TLabel').pack(side=tk.RIGHT)
-                
-                # Update count
-                current_count = int(count_label.cget("text"))
-                count_label.config(text=str(current_count + 1))
+        # Rebuild the per-column task id index; cards are only drawn for what is in view
+        self.board_status = {}
+        for status in self.board_lists:
+            self.board_lists[status] = []
+        
+        for task in self.store:
+            if task['status'] in self.board_lists:
+                self.board_lists[task['status']].append(task['id'])
+                self.board_status[task['id']] = task['status']
+        
+        for status, col in self.board_frames.items():
+            self.board_lists[status].sort()
+            col['column'].set_task_ids(self.board_lists[status])
+            col['count_label'].config(text=str(len(self.board_lists[status])))
+    
+    def refresh_board_cards(self, task_ids):
+        """Move the given tasks between board columns and redraw what is in view"""
+        for task_id in task_ids:
+            old_status = self.board_status.pop(task_id, None)
+            if old_status is not None:
+                ids = self.board_lists[old_status]
+                del ids[bisect_left(ids, task_id)]
+            
+            task = self.store.get(task_id)
+            if task is not None and task['status'] in self.board_lists:
+                insort(self.board_lists[task['status']], task_id)
+                self.board_status[task_id] = task['status']
+        
+        for status, col in self.board_frames.items():
+            col['column'].render()
+            col['count_label'].config(text=str(len(self.board_lists[status])))
     
     def update_calendar_view(self):
-        """Update the calendar view"""
-        # Clear current calendar
-        for widget in self.calendar_frame.winfo_children():
-            widget.destroy()
-        
-        # Set month/year label
+        """Update the calendar view, recomputing every month"""
+        self.calendar_models = {}
+        self.show_calendar_month()
+    
+    def show_calendar_month(self):
+        """Show the current month in the reusable calendar grid"""
         self.month_year_label.config(text=self.current_date.strftime("%B %Y"))
         
-        # Get first day of month and days in month
-        first_day = self.current_date.replace(day=1)
-        days_in_month = (first_day.replace(month=first_day.month % 12 + 1, day=1) - 
-                        timedelta(days=1)).day
-        
-        # Create day headers
-        headers = ['Sun', 'Mon', 'Tue', 'Wed', 'Thu', 'Fri', 'Sat']
-        for i, header in enumerate(headers):
-            label = ttk.Label(self.calendar_frame, text=header, style='Subtitle.TLabel',
-                            width=10, anchor=tk.CENTER)
-            label.grid(row=0, column=i, padx=2, pady=2)
-        
-        # Calculate starting position
-        start_pos = first_day.weekday()  # Monday is 0, Sunday is 6
-        
-        # Create calendar grid
-        day_num = 1
-        for row in range(1, 7):
-            for col in range(7):
-                if row == 1 and col < start_pos:
-                    # Empty cell before first day
-                    ttk.Frame(self.calendar_frame, style='Light.TFrame', 
-                             width=100, height=80).grid(row=row, column=col, padx=2, pady=2)
-                elif day_num <= days_in_month:
-                    # Day cell with tasks
-                    day_frame = ttk.Frame(self.calendar_frame, style='Light.TFrame',
-                                        borderwidth=1, relief='solid')
-                    day_frame.grid(row=row, column=col, padx=2, pady=2, sticky='nsew')
-                    
-                    # Day number
-                    day_label = ttk.Label(day_frame, text=str(day_num), style='Subtitle.TLabel')
-                    day_label.pack(anchor=tk.NW, padx=5, pady=5)
-                    
-                    # Get tasks for this day
-                    current_date_str = self.current_date.replace(day=day_num).strftime("%Y-%m-%d")
-                    day_tasks = [t for t in self.tasks if t['due_date'] == current_date_str]
-                    
-                    if day_tasks:
-                        # Show task count
-                        task_count = ttk.Label(day_frame, 
-                                              text=f"{len(day_tasks)} task{'s' if len(day_tasks) != 1 else ''}",
-                                              style='Subtitle.TLabel')
-                        task_count.pack(anchor=tk.SW, padx=5, pady=5)
-                    
-                    day_num += 1
-                else:
-                    # Empty cell after last day
-                    ttk.Frame(self.calendar_frame, style='Light.TFrame', 
-                             width=100, height=80).grid(row=row, column=col, padx=2, pady=2)
+        model = self.calendar_month_model(self.current_date.year, self.current_date.month)
+        for cell, entry in zip(self.calendar_grid, model):
+            if cell['model'] == entry:
+                continue
+            
+            if entry is None:
+                # Empty cell before the first or after the last day
+                cell['frame'].configure(borderwidth=0, relief='flat')
+                cell['day_label'].config(text="")
+                cell['count_label'].config(text="")
+            else:
+                cell['frame'].configure(borderwidth=1, relief='solid')
+                cell['day_label'].config(text=entry[1])
+                cell['count_label'].config(text=entry[2])
+            cell['model'] = entry
+        
+        # Have the neighbouring months ready before the user pages to them
+        if self.calendar_precompute_job is None:
+            self.calendar_precompute_job = self.root.after_idle(self.precompute_adjacent_months)
+    
+    def calendar_month_model(self, year, month):
+        """Get the (date, day number, summary) of the 42 grid cells of a month"""
+        model = self.calendar_models.get((year, month))
+        if model is None:
+            # Sunday is the first column
+            start_pos = (calendar.weekday(year, month, 1) + 1) % 7
+            model = [None] * 42
+            for day in range(1, calendar.monthrange(year, month)[1] + 1):
+                date_str = f"{year:04d}-{month:02d}-{day:02d}"
+                summary = self.calendar_day_text(date_str) if self.due_index.count(date_str) else ""
+                model[start_pos + day - 1] = (date_str, str(day), summary)
+            self.calendar_models[(year, month)] = model
+        return model
+    
+    def precompute_adjacent_months(self):
+        """Compute the previous and next month's cell models while idle"""
+        self.calendar_precompute_job = None
+        year, month = self.current_date.year, self.current_date.month
+        self.calendar_month_model(*((year - 1, 12) if month == 1 else (year, month - 1)))
+        self.calendar_month_model(*((year + 1, 1) if month == 12 else (year, month + 1)))
+    
+    def calendar_day_text(self, date_str):
+        """Summarize the tasks due on a day for its calendar cell"""
+        task_count = self.due_index.count(date_str)
+        text = f"{task_count} task{'s' if task_count != 1 else ''}"
+        
+        completed = self.due_index.count(date_str, 'completed')
+        if completed:
+            text += f" ({completed} done)"
+        
+        # Priority emoji with counts, most urgent first
+        breakdown = [f"{priority.split()[0]}{self.due_index.count(date_str, priority)}"
+                     for priority in self.priorities
+                     if self.due_index.count(date_str, priority)]
+        if breakdown:
+            text += "\n" + " ".join(breakdown)
+        return text
+    
+    def refresh_calendar_days(self, days):
+        """Update the calendar after the tasks due on some days changed"""
+        for date_str in days:
+            try:
+                self.calendar_models.pop((int(date_str[:4]), int(date_str[5:7])), None)
+            except ValueError:
+                pass
         
-        # Configure grid weights
-        for col in range(7):
-            self.calendar_frame.grid_columnconfigure(col, weight=1)
-        for row in range(1, 7):
-            self.calendar_frame.grid_rowconfigure(row, weight=1)
+        # Only cells whose text changed are touched
+        self.show_calendar_month()
     
     def update_progress_view(self):
         """Update the progress statistics view"""
         # Calculate completion rate
-        total_tasks = len(self.tasks)
-        completed_tasks = len([t for t in self.tasks if t['completed']])
+        total_tasks = self.stats.total
+        completed_tasks = self.stats.completed
         completion_rate = (completed_tasks / total_tasks * 100) if total_tasks > 0 else 0
         
         self.completion_rate['value'] = completion_rate
         
         # Update priority bars
-        for priority in self.priorities:
-            tasks_in_priority = [t for t in self.tasks if t['priority'] == priority]
-            completed_in_priority = len([t for t in tasks_in_priority if t['completed']])
-            total_in_priority = len(tasks_in_priority)
+        for priority in self.priority_bars:
+            completed_in_priority = self.stats.completed_by_priority[priority]
+            total_in_priority = self.stats.by_priority[priority]
             
             completion_rate = (completed_in_priority / total_in_priority * 100) if total_in_priority > 0 else 0
             
@@ -839,74 +1591,210 @@ class UltimateTodoApp:
     
     def update_status_bar(self):
         """Update the status bar information"""
-        total_tasks = len(self.tasks)
-        completed_tasks = len([t for t in self.tasks if t['completed']])
+        total_tasks = self.stats.total
+        completed_tasks = self.stats.completed
         
         self.task_count_label.config(text=f"Tasks: {total_tasks}")
         self.completed_count_label.config(text=f"Completed: {completed_tasks}")
         
-        selected = self.get_selected_task()
+        selected = self.get_selected_tasks()
         if selected:
-            self.selected_label.config(text=f"Selected: {selected['title']}")
+            if len(selected) > 1:
+                self.selected_label.config(text=f"Selected: {len(selected)} tasks")
+                self.edit_task_btn.config(text="✏️ Edit All")
+            else:
+                self.selected_label.config(text=f"Selected: {selected[0]['title']}")
+                self.edit_task_btn.config(text="✏️ Edit")
             # Update button states
             self.edit_task_btn.config(state=tk.NORMAL)
             self.delete_task_btn.config(state=tk.NORMAL)
             self.complete_task_btn.config(state=tk.NORMAL)
             
             # Update complete button text based on current state
-            btn_text = "✓ Complete" if not selected['completed'] else "↻ Undo"
+            all_done = all(task['completed'] for task in selected)
+            btn_text = "✓ Complete" if not all_done else "↻ Undo"
             self.complete_task_btn.config(text=btn_text)
         else:
             self.selected_label.config(text="Selected: None")
+            self.edit_task_btn.config(text="✏️ Edit")
             self.edit_task_btn.config(state=tk.DISABLED)
             self.delete_task_btn.config(state=tk.DISABLED)
             self.complete_task_btn.config(state=tk.DISABLED)
     
+    def update_sidebar_stats(self):
+        """Update the live statistics in the sidebar"""
+        lines = [
+            f"Tasks: {self.stats.total}",
+            f"Completed: {self.stats.completed}",
+            f"In progress: {self.stats.by_status['in_progress']}",
+            f"Overdue: {self.stats.overdue()}"
+        ]
+        self.sidebar_stats_label.config(text="\n".join(lines))
+    
     # ==============================================
     # Filtering and Searching
     # ==============================================
     
     def filter_tasks(self, filter_type, filter_value=None):
-        """Filter tasks based on criteria"""
-        if filter_type == 'all':
-            filtered_tasks = self.tasks
-        elif filter_type == 'today':
-            today = datetime.now().strftime("%Y-%m-%d")
-            filtered_tasks = [t for t in self.tasks if t['due_date'] == today]
-        elif filter_type == 'upcoming':
-            today = datetime.now().strftime("%Y-%m-%d")
-            filtered_tasks = [t for t in self.tasks if t['due_date'] and t['due_date'] >= today]
-        elif filter_type == 'completed':
-            filtered_tasks = [t for t in self.tasks if t['completed']]
-        elif filter_type == 'category':
-            filtered_tasks = [t for t in self.tasks if t['category'] == filter_value]
-        elif filter_type == 'priority':
-            filtered_tasks = [t for t in self.tasks if t['priority'] == filter_value]
+        """Show only the tasks matching one filter, or all tasks for 'all'"""
+        self.filter_toggles = {}
+        if filter_type in FILTER_TOGGLES:
+            self.filter_toggles[FILTER_TOGGLES[filter_type]] = True
+        elif filter_type in ('category', 'priority'):
+            self.filter_toggles[(filter_type, filter_value)] = True
+        self.apply_filters()
+    
+    def toggle_filter(self, group, value, exclude=False):
+        """Switch a sidebar filter on or off; an excluded filter hides the tasks it matches"""
+        key, include = (group, value), not exclude
+        if self.filter_toggles.get(key) == include:
+            del self.filter_toggles[key]
+        elif key == ('due', 'range'):
+            self.open_due_range_dialog(include)
+            return
         else:
-            filtered_tasks = self.tasks
+            self.filter_toggles[key] = include
+        self.apply_filters()
+    
+    def open_due_range_dialog(self, include):
+        """Ask for the dates of the custom due date range filter"""
+        dialog = tk.Toplevel(self.root)
+        dialog.title("📆 Due Date Range")
+        dialog.geometry("360x230")
+        dialog.resizable(False, False)
+        dialog.transient(self.root)
+        dialog.grab_set()
+        dialog.configure(bg=self.colors['dark_bg'])
+        
+        form_frame = ttk.Frame(dialog, style='Light.TFrame')
+        form_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+        
+        entries = []
+        for label, value in zip(("From (YYYY-MM-DD):", "To (YYYY-MM-DD):"), self.due_range):
+            ttk.Label(form_frame, text=label, style='Subtitle.TLabel').pack(anchor=tk.W, pady=(5, 0))
+            row = ttk.Frame(form_frame, style='Light.TFrame')
+            row.pack(fill=tk.X, padx=5, pady=5)
+            entry = ttk.Entry(row, style='Dark.TEntry')
+            entry.insert(0, value or "")
+            entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+            ttk.Button(row, text="📅", width=3, style='Secondary.TButton',
+                       command=lambda e=entry: self.show_calendar(e)).pack(side=tk.RIGHT, padx=(5, 0))
+            entries.append(entry)
+        
+        def apply():
+            start, end = (entry.get().strip() or None for entry in entries)
+            for due_date in (start, end):
+                if due_date:
+                    try:
+                        datetime.strptime(due_date, "%Y-%m-%d")
+                    except ValueError:
+                        messagebox.showwarning("Warning", "Dates must be in YYYY-MM-DD format!",
+                                               parent=dialog)
+                        return
+            if start and end and start > end:
+                start, end = end, start
+            
+            dialog.destroy()
+            self.due_range = (start, end)
+            button, _ = self.filter_buttons[('due', 'range')]
+            text = f"📆 {start or '…'} → {end or '…'}"
+            self.filter_buttons[('due', 'range')] = (button, text)
+            self.filter_toggles[('due', 'range')] = include
+            self.apply_filters()
         
-        self.update_task_list(filtered_tasks)
-        self.log_activity(f"Filtered tasks: {filter_type} {filter_value or ''}")
+        button_frame = ttk.Frame(form_frame, style='Light.TFrame')
+        button_frame.pack(fill=tk.X, pady=10)
+        ttk.Button(button_frame, text="Cancel", style='Secondary.TButton',
+                   command=dialog.destroy).pack(side=tk.LEFT, padx=5, expand=True)
+        ttk.Button(button_frame, text="Apply", style='Accent.TButton',
+                   command=apply).pack(side=tk.RIGHT, padx=5, expand=True)
+    
+    def filter_query(self, group, value):
+        """Get the query of one sidebar filter"""
+        return self.sidebar_query(group, value, datetime.now().date(), self.due_range)
+    
+    @staticmethod
+    def sidebar_query(group, value, today, due_range=(None, None)):
+        """Get the query of a sidebar filter on a given day; due_range is the Date Range filter's"""
+        if group == 'due':
+            if value == 'today':
+                return DueBetween(today.isoformat(), today.isoformat())
+            if value == 'upcoming':
+                return DueBetween(today.isoformat())
+            if value == 'week':
+                monday = today - timedelta(days=today.weekday())
+                return DueBetween(monday.isoformat(), (monday + timedelta(days=6)).isoformat())
+            if value == 'overdue':
+                yesterday = (today - timedelta(days=1)).isoformat()
+                return DueBetween(None, yesterday) & ~Field('completed', True)
+            return DueBetween(*due_range)
+        if group == 'state':
+            return Field('completed', True)
+        return Field(group, value)
+    
+    def build_filter_query(self):
+        """Combine the active sidebar filters into one query"""
+        included, excluded = {}, []
+        for (group, value), include in self.filter_toggles.items():
+            query = self.filter_query(group, value)
+            if include:
+                included.setdefault(group, []).append(query)
+            else:
+                excluded.append(~query)
+        return All(*[Any(*queries) for queries in included.values()], *excluded)
+    
+    def apply_filters(self, log=True):
+        """Show the tasks matching the sidebar filters and mark the active toggles"""
+        for key, (button, text) in self.filter_buttons.items():
+            include = self.filter_toggles.get(key)
+            button.config(style='Secondary.TButton' if include is None else 'Accent.TButton',
+                          text=text if include is not False else "🚫 " + text)
+        
+        # The query answers the whole view from bitmaps, its predicate checks changed tasks
+        query = self.build_filter_query()
+        self.search_rank = None
+        if self.filter_toggles:
+            self.set_list_filter(query.matches, lambda: query.task_ids(self.table))
+        else:
+            self.set_list_filter(None)
+        if log:
+            self.log_activity(f"Filtered tasks: {query}")
     
     def toggle_search(self):
         """Toggle the search bar visibility"""
         if self.search_frame.winfo_ismapped():
             self.search_frame.pack_forget()
             self.search_entry.delete(0, tk.END)
-            self.update_task_list()
+            if self.search_rank is not None:
+                self.apply_filters(log=False)
         else:
             self.search_frame.pack(fill=tk.X, pady=5)
             self.search_entry.focus()
     
-    def perform_search(self):
-        """Search tasks by title or description"""
-        query = self.search_entry.get().lower()
-        if query:
-            filtered_tasks = [
-                t for t in self.tasks 
-                if query in t['title'].lower() or query in t['description'].lower()
-            ]
-            self.update_task_list(filtered_tasks)
+    def schedule_search(self):
+        """Search as the user types, once typing pauses"""
+        if self.search_job is not None:
+            self.root.after_cancel(self.search_job)
+        self.search_job = self.root.after(SEARCH_DEBOUNCE_MS,
+                                          lambda: self.perform_search(log=False))
+    
+    def perform_search(self, log=True):
+        """Search tasks by title or description words, best matches first"""
+        if self.search_job is not None:
+            self.root.after_cancel(self.search_job)
+            self.search_job = None
+        
+        query = self.search_entry.get().strip()
+        if not query:
+            if self.search_rank is not None:
+                self.apply_filters(log=False)
+            return
+        
+        # Every match is ranked, so bulk actions and exports see the whole result
+        rank = {task_id: i for i, task_id in enumerate(self.search_index.search(query))}
+        self.search_rank = rank
+        self.set_list_filter(lambda t: t['id'] in rank, lambda: list(rank))
+        if log:
             self.log_activity(f"Searched for: {query}")
     
     # ==============================================
@@ -1010,8 +1898,12 @@ class UltimateTodoApp:
         self.task_dialog.destroy()
     
     def edit_selected_task(self):
-        """Edit the currently selected task"""
-        task = self.get_selected_task()
+        """Edit the currently selected task, or all selected tasks together"""
+        selected = self.get_selected_tasks()
+        if len(selected) > 1:
+            self.open_bulk_edit_dialog(selected)
+            return
+        task = selected[0] if selected else None
         if not task:
             messagebox.showwarning("Warning", "No task selected!", parent=self.root)
             return
@@ -1151,8 +2043,16 @@ class UltimateTodoApp:
         self.edit_dialog.destroy()
     
     def delete_selected_task(self):
-        """Delete the currently selected task"""
-        task = self.get_selected_task()
+        """Delete the currently selected task, or all selected tasks"""
+        selected = self.get_selected_tasks()
+        if len(selected) > 1:
+            if messagebox.askyesno("Confirm Delete",
+                                   f"Are you sure you want to delete {len(selected)} tasks?",
+                                   parent=self.root):
+                self.delete_tasks([task['id'] for task in selected])
+            return
+        
+        task = selected[0] if selected else None
         if task:
             if messagebox.askyesno("Confirm Delete", 
                                  f"Are you sure you want to delete '{task['title']}'?",
@@ -1243,20 +2143,33 @@ class UltimateTodoApp:
         stats_frame = ttk.Frame(stats_dialog, style='Light.TFrame')
         stats_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         
+        # Counts are bit counts over the task table, within the sidebar filters if any are on
+        table = self.table
+        within = self.build_filter_query().bitmap(table) if self.filter_toggles else None
+        completed = table.bitmap('completed', True)
+        if within is not None:
+            completed &= within
+            ttk.Label(stats_frame, text=f"Filtered: {self.build_filter_query()}",
+                      style='Subtitle.TLabel').pack(anchor=tk.W)
+        total = (table.live if within is None else within).bit_count()
+        completed_count = completed.bit_count()
+        by_priority, completed_by_priority = table.counts('priority', within), table.counts('priority', completed)
+        by_category, completed_by_category = table.counts('category', within), table.counts('category', completed)
+        
         # Total tasks
         total_frame = ttk.Frame(stats_frame, style='Light.TFrame')
         total_frame.pack(fill=tk.X, pady=5)
         
         ttk.Label(total_frame, text="Total Tasks:", style='Subtitle.TLabel').pack(side=tk.LEFT)
-        ttk.Label(total_frame, text=str(len(self.tasks)), style='Subtitle.TLabel').pack(side=tk.RIGHT)
+        ttk.Label(total_frame, text=str(total), style='Subtitle.TLabel').pack(side=tk.RIGHT)
         
         # Completed tasks
         completed_frame = ttk.Frame(stats_frame, style='Light.TFrame')
         completed_frame.pack(fill=tk.X, pady=5)
         
         ttk.Label(completed_frame, text="Completed Tasks:", style='Subtitle.TLabel').pack(side=tk.LEFT)
-        completed_count = len([t for t in self.tasks if t['completed']])
-        ttk.Label(completed_frame, text=f"{completed_count} ({completed_count/len(self.tasks)*100:.1f}%)", 
+        completed_share = completed_count / total * 100 if total else 0
+        ttk.Label(completed_frame, text=f"{completed_count} ({completed_share:.1f}%)", 
                  style='Subtitle.TLabel').pack(side=tk.RIGHT)
         
         # Tasks by priority
@@ -1268,11 +2181,9 @@ class UltimateTodoApp:
             
             ttk.Label(prio_frame, text=priority, style='Subtitle.TLabel').pack(side=tk.LEFT)
             
-            tasks_in_priority = [t for t in self.tasks if t['priority'] == priority]
-            completed_in_priority = len([t for t in tasks_in_priority if t['completed']])
-            
             ttk.Label(prio_frame, 
-                     text=f"{len(tasks_in_priority)} ({completed_in_priority} completed)", 
+                     text=f"{by_priority.get(priority, 0)} "
+                          f"({completed_by_priority.get(priority, 0)} completed)", 
                      style='Subtitle.TLabel').pack(side=tk.RIGHT)
         
         # Tasks by category
@@ -1284,11 +2195,9 @@ class UltimateTodoApp:
             
             ttk.Label(cat_frame, text=category, style='Subtitle.TLabel').pack(side=tk.LEFT)
             
-            tasks_in_category = [t for t in self.tasks if t['category'] == category]
-            completed_in_category = len([t for t in tasks_in_category if t['completed']])
-            
             ttk.Label(cat_frame, 
-                     text=f"{len(tasks_in_category)} ({completed_in_category} completed)", 
+                     text=f"{by_category.get(category, 0)} "
+                          f"({completed_by_category.get(category, 0)} completed)", 
                      style='Subtitle.TLabel').pack(side=tk.RIGHT)
         
         # Close button
@@ -1366,6 +2275,9 @@ class UltimateTodoApp:
         ttk.Button(data_frame, text="Backup Data", style='Secondary.TButton',
                   command=self.backup_data).pack(fill=tk.X, padx=20, pady=5)
         
+        ttk.Button(data_frame, text="Restore Backup", style='Secondary.TButton',
+                  command=self.restore_backup).pack(fill=tk.X, padx=20, pady=5)
+        
         ttk.Button(data_frame, text="Reset All Data", style='Accent.TButton',
                   command=self.confirm_reset).pack(fill=tk.X, padx=20, pady=10)
         
@@ -1404,7 +2316,19 @@ Features:
         if color[1]:
             self.colors[color_key] = color[1]
             self.configure_styles()
-            self.update_all_views()
+            self.apply_theme_colors()
+            self.request_autosave()
+    
+    def apply_theme_colors(self):
+        """Recolor the plain tk widgets, which don't follow ttk styles"""
+        self.tree.tag_configure('completed', foreground=self.colors['completed'])
+        if 'board' in self.built_views:
+            for col in self.board_frames.values():
+                col['canvas'].configure(bg=self.colors['light_bg'])
+        if 'progress' in self.built_views:
+            self.activity_log.configure(bg=self.colors['light_bg'],
+                                        fg=self.colors['text'],
+                                        insertbackground=self.colors['text'])
     
     def apply_font(self):
         """Apply the selected font"""
@@ -1417,96 +2341,338 @@ Features:
             self.style.configure('Title.TLabel', font=(selected_font, 18, 'bold'))
             self.style.configure('Subtitle.TLabel', font=(selected_font, 12))
             
-            # Force refresh of all widgets
-            self.update_all_views()
+            # ttk widgets pick up style changes themselves, no view rebuild needed
         except:
             messagebox.showerror("Error", "Failed to apply font. The font may not be available on your system.")
     
     def export_tasks(self):
-        """Export tasks to a JSON file"""
+        """Show the export dialog: format and which tasks to export"""
+        dialog = tk.Toplevel(self.root)
+        dialog.title("📤 Export Tasks")
+        dialog.geometry("400x430")
+        dialog.resizable(False, False)
+        dialog.transient(self.root)
+        dialog.grab_set()
+        dialog.configure(bg=self.colors['dark_bg'])
+        
+        ttk.Label(dialog, text="📤 Export Tasks", style='Title.TLabel').pack(pady=10)
+        
+        form_frame = ttk.Frame(dialog, style='Light.TFrame')
+        form_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        
+        formats = {"NDJSON (one task per line)": ".ndjson", "CSV": ".csv", "JSON": ".json"}
+        ttk.Label(form_frame, text="Format:", style='Subtitle.TLabel').pack(anchor=tk.W, pady=(10, 0))
+        format_combo = ttk.Combobox(form_frame, values=list(formats), state='readonly',
+                                    style='Dark.TCombobox')
+        format_combo.set("NDJSON (one task per line)")
+        format_combo.pack(fill=tk.X, padx=5, pady=5)
+        
+        ttk.Label(form_frame, text="Tasks:", style='Subtitle.TLabel').pack(anchor=tk.W, pady=(10, 0))
+        scope_combo = ttk.Combobox(form_frame, values=["All tasks", "Current list view"],
+                                   state='readonly', style='Dark.TCombobox')
+        scope_combo.set("All tasks")
+        scope_combo.pack(fill=tk.X, padx=5, pady=5)
+        
+        ttk.Label(form_frame, text="Category:", style='Subtitle.TLabel').pack(anchor=tk.W, pady=(10, 0))
+        category_combo = ttk.Combobox(form_frame, values=["All categories"] + self.categories,
+                                      state='readonly', style='Dark.TCombobox')
+        category_combo.set("All categories")
+        category_combo.pack(fill=tk.X, padx=5, pady=5)
+        
+        ttk.Label(form_frame, text="Due between (YYYY-MM-DD, optional):",
+                  style='Subtitle.TLabel').pack(anchor=tk.W, pady=(10, 0))
+        due_frame = ttk.Frame(form_frame, style='Light.TFrame')
+        due_frame.pack(fill=tk.X, padx=5, pady=5)
+        due_from_entry = ttk.Entry(due_frame, style='Dark.TEntry', width=14)
+        due_from_entry.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        due_to_entry = ttk.Entry(due_frame, style='Dark.TEntry', width=14)
+        due_to_entry.pack(side=tk.RIGHT, fill=tk.X, expand=True, padx=(5, 0))
+        
+        def start():
+            due_from, due_to = due_from_entry.get().strip(), due_to_entry.get().strip()
+            for due_date in (due_from, due_to):
+                if due_date:
+                    try:
+                        datetime.strptime(due_date, "%Y-%m-%d")
+                    except ValueError:
+                        messagebox.showwarning("Warning", "Dates must be in YYYY-MM-DD format!",
+                                               parent=dialog)
+                        return
+            
+            category = category_combo.get()
+            predicate = export_filter(
+                category=None if category == "All categories" else category,
+                due_from=due_from or None,
+                due_to=due_to or None,
+                predicate=self.list_filter if scope_combo.get() == "Current list view" else None
+            )
+            extension = formats[format_combo.get()]
+            dialog.destroy()
+            self.start_export(extension, predicate)
+        
+        button_frame = ttk.Frame(form_frame, style='Light.TFrame')
+        button_frame.pack(fill=tk.X, pady=10)
+        ttk.Button(button_frame, text="Cancel", style='Secondary.TButton',
+                   command=dialog.destroy).pack(side=tk.LEFT, padx=5, expand=True)
+        ttk.Button(button_frame, text="Export", style='Accent.TButton',
+                   command=start).pack(side=tk.RIGHT, padx=5, expand=True)
+    
+    def start_export(self, extension, predicate):
+        """Ask for the target file and stream the matching tasks to it in the background"""
         from tkinter import filedialog
         
         file_path = filedialog.asksaveasfilename(
-            defaultextension=".json",
-            filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+            defaultextension=extension,
+            filetypes=[("Export files", f"*{extension}"), ("All files", "*.*")],
             title="Export tasks to file"
         )
+        if not file_path:
+            return
         
-        if file_path:
-            try:
-                with open(file_path, 'w') as f:
-                    json.dump(self.tasks, f, indent=2)
-                messagebox.showinfo("Success", "Tasks exported successfully!")
-            except Exception as e:
-                messagebox.showerror("Error", f"Failed to export tasks: {str(e)}")
+        # The snapshot stays as it is while the worker reads it, whatever is edited meanwhile
+        exporter = TaskExporter(self.store.snapshot(), file_path,
+                                fmt=TaskExporter.format_for(extension), predicate=predicate)
+        progress = self.open_progress_dialog("📤 Exporting Tasks", exporter.cancel)
+        exporter.start()
+        
+        def check_progress():
+            if progress['cancelled']:
+                self.log_activity("Export cancelled")
+                return
+            progress['bar']['value'] = exporter.progress * 100
+            progress['label'].config(text=f"{exporter.written} tasks exported")
+            if not exporter.done:
+                self.root.after(100, check_progress)
+                return
+            
+            progress['dialog'].destroy()
+            if exporter.error is not None:
+                messagebox.showerror("Error", f"Failed to export tasks: {str(exporter.error)}")
+            else:
+                self.log_activity(f"Exported {exporter.written} tasks")
+                messagebox.showinfo("Success", f"Exported {exporter.written} tasks successfully!")
+        
+        check_progress()
     
     def import_tasks(self):
-        """Import tasks from a JSON file"""
+        """Import tasks from a JSON array or NDJSON file, a batch at a time"""
         from tkinter import filedialog
         
         file_path = filedialog.askopenfilename(
-            filetypes=[("JSON files", "*.json"), ("All files", "*.*")],
+            filetypes=[("JSON files", "*.json"), ("NDJSON files", "*.ndjson *.jsonl"),
+                       ("All files", "*.*")],
             title="Import tasks from file"
         )
         
-        if file_path:
+        if not file_path:
+            return
+        try:
+            importer = TaskImporter(self.store, file_path)
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to import tasks: {str(e)}")
+            return
+        
+        progress = self.open_progress_dialog("📥 Importing Tasks", importer.cancel)
+        
+        def import_batch():
+            if progress['cancelled']:
+                self.log_activity("Import cancelled")
+                return
             try:
-                with open(file_path, 'r') as f:
-                    imported_tasks = json.load(f)
-                
-                # Validate imported tasks
-                if not isinstance(imported_tasks, list):
-                    raise ValueError("Invalid file format")
-                
-                # Merge with existing tasks
-                max_id = max([t['id'] for t in self.tasks]) if self.tasks else 0
-                for task in imported_tasks:
-                    if isinstance(task, dict) and 'title' in task:
-                        max_id += 1
-                        task['id'] = max_id
-                        self.tasks.append(task)
-                
-                self.update_all_views()
-                messagebox.showinfo("Success", f"Imported {len(imported_tasks)} tasks successfully!")
+                more = importer.step()
             except Exception as e:
+                # Nothing is kept from a file that could not be read completely
+                importer.cancel()
+                progress['dialog'].destroy()
                 messagebox.showerror("Error", f"Failed to import tasks: {str(e)}")
+                return
+            
+            progress['bar']['value'] = importer.progress * 100
+            progress['label'].config(text=f"{len(importer.imported_ids)} tasks imported")
+            if more:
+                # Yield to the event loop between batches, so the window stays responsive
+                self.root.after(1, import_batch)
+                return
+            
+            progress['dialog'].destroy()
+            count = len(importer.imported_ids)
+            self.log_activity(f"Imported {count} tasks")
+            message = f"Imported {count} tasks successfully!"
+            if importer.skipped:
+                message += f"\n{importer.skipped} records without a title were skipped."
+            messagebox.showinfo("Success", message)
+        
+        self.root.after(1, import_batch)
+    
+    def open_progress_dialog(self, title, on_cancel):
+        """Show a progress bar with a Cancel button for a long running job"""
+        dialog = tk.Toplevel(self.root)
+        dialog.title(title)
+        dialog.geometry("400x150")
+        dialog.resizable(False, False)
+        dialog.transient(self.root)
+        dialog.grab_set()
+        dialog.configure(bg=self.colors['dark_bg'])
+        
+        progress = {'dialog': dialog, 'cancelled': False}
+        
+        ttk.Label(dialog, text=title, style='Subtitle.TLabel').pack(pady=(15, 5))
+        progress['bar'] = ttk.Progressbar(dialog, style='Custom.Horizontal.TProgressbar',
+                                          orient=tk.HORIZONTAL, length=350, mode='determinate')
+        progress['bar'].pack(padx=20, pady=5)
+        progress['label'] = ttk.Label(dialog, text="", style='Subtitle.TLabel')
+        progress['label'].pack()
+        
+        def cancel():
+            progress['cancelled'] = True
+            on_cancel()
+            dialog.destroy()
+        
+        ttk.Button(dialog, text="Cancel", style='Secondary.TButton', command=cancel).pack(pady=10)
+        dialog.protocol("WM_DELETE_WINDOW", cancel)
+        return progress
     
     def backup_data(self):
-        """Backup all application data"""
-        backup_data = {
-            'tasks': self.tasks,
-            'categories': self.categories,
-            'priorities': self.priorities,
-            'colors': self.colors,
-            'version': 1
-        }
-        
+        """Add a backup to an .empressbak file, writing only what changed since the last one"""
         from tkinter import filedialog
         
         file_path = filedialog.asksaveasfilename(
             defaultextension=".empressbak",
             filetypes=[("Empress Backup", "*.empressbak"), ("All files", "*.*")],
-            title="Backup application data"
+            title="Backup application data",
+            confirmoverwrite=False  # Backups are appended to an existing file
         )
+        if not file_path:
+            return
+        
+        # Backups are only appended to version 2 files; anything else would be lost
+        backup = BackupFile(file_path)
+        replace = not backup.can_append()
+        if replace and not messagebox.askyesno(
+                "Replace File",
+                f"{os.path.basename(file_path)} is not a version 2 backup file "
+                "and cannot be added to.\n\nReplace it? Its contents, including "
+                "older backups, will be lost."):
+            return
+        
+        tasks, next_id = self.store.snapshot(), self.store.next_id
+        settings = {
+            'categories': list(self.categories),
+            'priorities': list(self.priorities),
+            'colors': dict(self.colors)
+        }
+        result = {}
         
-        if file_path:
+        def write():
             try:
-                with open(file_path, 'w') as f:
-                    json.dump(backup_data, f, indent=2)
+                result['counts'] = backup.write(tasks, next_id, settings, replace=replace)
+            except Exception as e:
+                result['error'] = e
+        
+        worker = threading.Thread(target=write, daemon=True)
+        worker.start()
+        
+        def check_done():
+            if worker.is_alive():
+                self.root.after(100, check_done)
+            elif 'error' in result:
+                messagebox.showerror("Error", f"Failed to create backup: {str(result['error'])}")
+            else:
+                written, reused = result['counts']
+                self.log_activity(f"Backup created: {written} new segments, {reused} unchanged")
                 messagebox.showinfo("Success", "Backup created successfully!")
+        
+        check_done()
+    
+    def restore_backup(self):
+        """Pick a backup from an .empressbak file and replace all data with it"""
+        from tkinter import filedialog
+        
+        file_path = filedialog.askopenfilename(
+            filetypes=[("Empress Backup", "*.empressbak"), ("All files", "*.*")],
+            title="Restore application data"
+        )
+        if not file_path:
+            return
+        
+        backup = BackupFile(file_path)
+        try:
+            points = backup.points()
+        except Exception as e:
+            messagebox.showerror("Error", f"Failed to read backup: {str(e)}")
+            return
+        if not points:
+            messagebox.showerror("Error", "The file contains no complete backup.")
+            return
+        
+        dialog = tk.Toplevel(self.root)
+        dialog.title("♻️ Restore Backup")
+        dialog.geometry("420x400")
+        dialog.resizable(False, False)
+        dialog.transient(self.root)
+        dialog.grab_set()
+        dialog.configure(bg=self.colors['dark_bg'])
+        
+        ttk.Label(dialog, text="♻️ Restore Backup", style='Title.TLabel').pack(pady=10)
+        ttk.Label(dialog, text="Restore the data as it was at:",
+                  style='Subtitle.TLabel').pack(anchor=tk.W, padx=10)
+        
+        point_list = tk.Listbox(dialog, bg=self.colors['light_bg'], fg=self.colors['text'],
+                                selectbackground=self.colors['selected'], height=10)
+        point_list.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        for point in reversed(points):
+            point_list.insert(tk.END, f"{point['created_at']}  —  {point['count']} tasks")
+        point_list.selection_set(0)
+        
+        def verify():
+            problems = backup.verify()
+            if problems:
+                messagebox.showerror("Verification Failed", "\n".join(problems[:10]), parent=dialog)
+            else:
+                messagebox.showinfo("Verified", "All backups in the file are intact.", parent=dialog)
+        
+        def restore():
+            selection = point_list.curselection()
+            if not selection:
+                return
+            if not messagebox.askyesno("Confirm Restore",
+                                       "Replace all current data with this backup?",
+                                       icon='warning', parent=dialog):
+                return
+            try:
+                data = backup.restore(len(points) - 1 - selection[0])
             except Exception as e:
-                messagebox.showerror("Error", f"Failed to create backup: {str(e)}")
+                messagebox.showerror("Error", f"Failed to restore backup: {str(e)}", parent=dialog)
+                return
+            
+            dialog.destroy()
+            self.categories = data.get('categories', self.categories)
+            self.priorities = data.get('priorities', self.priorities)
+            self.colors.update(data.get('colors', {}))
+            self.configure_styles()
+            self.apply_theme_colors()
+            self.reset_list_orders()
+            self.store.load(data['tasks'], data.get('next_id'))
+            self.log_activity(f"Restored {len(data['tasks'])} tasks from backup")
+            messagebox.showinfo("Success", "Backup restored successfully!")
+        
+        button_frame = ttk.Frame(dialog, style='Dark.TFrame')
+        button_frame.pack(fill=tk.X, padx=10, pady=10)
+        ttk.Button(button_frame, text="Verify", style='Secondary.TButton',
+                   command=verify).pack(side=tk.LEFT, padx=5, expand=True)
+        ttk.Button(button_frame, text="Restore", style='Accent.TButton',
+                   command=restore).pack(side=tk.RIGHT, padx=5, expand=True)
     
     def confirm_reset(self):
         """Confirm before resetting all data"""
         if messagebox.askyesno("Confirm Reset", 
                              "Are you sure you want to reset all data? This cannot be undone!",
                              icon='warning'):
-            self.tasks = []
-            self.categories = ['💼 Work', '🏠 Personal', '🎓 Study', '❤️ Health', '🛒 Shopping', '🎉 Fun']
-            self.priorities = ['🔥 Critical', '⚠️ High', '🔼 Medium', '🔽 Low', '🌱 Chill']
+            self.categories = list(DEFAULT_CATEGORIES)
+            self.priorities = list(DEFAULT_PRIORITIES)
+            self.reset_list_orders()
+            self.store.clear()
             
-            self.update_all_views()
             messagebox.showinfo("Reset Complete", "All data has been reset to defaults.")
     
     def show_daily_quote(self):
@@ -1525,91 +2691,262 @@ Features:
         ]
         
         quote = random.choice(quotes)
-        messagebox.showinfo("Daily Motivation", quote)
+        self.show_message(quote, 15000)
     
     # ==============================================
     # Data Persistence Methods
     # ==============================================
     
     def load_data(self):
-        """Load saved data from file"""
-        data_file = "empress_todo_data.json"
-        if os.path.exists(data_file):
-            try:
-                with open(data_file, 'r') as f:
-                    data = json.load(f)
-                    self.tasks = data.get('tasks', [])
-                    self.categories = data.get('categories', self.categories)
-                    self.priorities = data.get('priorities', self.priorities)
-                    self.colors = data.get('colors', self.colors)
-            except:
-                # If loading fails, use defaults
-                pass
+        """Load saved data, on a worker thread in fast start so the window shows at once"""
+        if not FAST_START:
+            self.finish_loading(self.read_saved_data())
+            return
+        
+        result = []
+        worker = threading.Thread(target=lambda: result.append(self.read_saved_data()),
+                                  daemon=True)
+        worker.start()
+        self.show_message("⏳ Loading tasks...", 600000)
+        
+        def check_loaded():
+            if worker.is_alive():
+                self.root.after(50, check_loaded)
+            else:
+                self.finish_loading(result[0])
+        
+        check_loaded()
+    
+    def read_saved_data(self):
+        """Read saved data and build a store from it; touches no widgets or app state
+
+        Returns the data, the store and its indexes, and the error if loading failed.
+        """
+        try:
+            data = self.storage.load()
+            return data, self.build_store(data), None
+        except Exception as e:
+            # Start empty, but leave the saved data alone, see finish_loading
+            return None, self.build_store(None), e
+    
+    @staticmethod
+    def build_store(data):
+        """Create a task store with the indexes the views use"""
+        store = TaskStore()
+        if data:
+            store.load(data.get('tasks', []), data.get('next_id'))
+        # Indexes are filled once, after the tasks are in; the list view's default
+        # order is sorted here too, off the UI thread when loading in the background
+        data = data or {}
+        default_order = OrderIndex(*UltimateTodoApp.list_order_key(
+            'default', data.get('priorities', DEFAULT_PRIORITIES),
+            data.get('categories', DEFAULT_CATEGORIES)))
+        indexes = [store.add_index(index) for index in (DueDateIndex(), TaskAggregates(),
+                                                         SearchIndex(), TaskTable(), default_order)]
+        return store, indexes
+    
+    def install_store(self, store, indexes):
+        self.store = store
+        self.due_index, self.stats, self.search_index, self.table, default_order = indexes
+        self.list_orders = {'default': default_order}  # Other orders are added on first use
+    
+    def finish_loading(self, result):
+        """Switch to the loaded store and settings and repaint everything"""
+        (data, (store, indexes), error), interim = result, self.store
+        self.install_store(store, indexes)
+        if data:
+            self.categories = data.get('categories', self.categories)
+            self.priorities = data.get('priorities', self.priorities)
+            self.colors = data.get('colors', self.colors)
+            self.configure_styles()
+            self.apply_theme_colors()
+            self.build_group_filter_buttons()
+            
+            # Drop toggles picked while loading for categories or priorities not in the data,
+            # and mark the active ones on the new buttons
+            stale = [key for key in self.filter_toggles if key not in self.filter_buttons]
+            for key in stale:
+                del self.filter_toggles[key]
+            if stale or self.filter_toggles:
+                self.apply_filters(log=False)
+        
+        store.subscribe(self.on_store_changed)
+        if error is not None:
+            # Nothing is saved, so the unreadable data is not overwritten
+            messagebox.showerror("Error", f"Failed to load saved data: {str(error)}\n\n"
+                                 "Changes made now will not be saved.")
+        else:
+            # Storage that writes per change follows the store from here on
+            self.storage.attach(store)
+            self.data_loaded = True
+        
+        # Keep tasks added while loading
+        if len(interim):
+            with store.batch():
+                for task in interim:
+                    store.insert(task.copy())
+        if self.unsaved_changes:
+            self.request_autosave()
+        
+        self.update_all_views()
+        self.show_daily_quote()
     
     def save_data(self):
-        """Save data to file"""
+        """Hand a snapshot of the data to storage, which writes it in the background"""
+        if not self.data_loaded:
+            return  # Saving now would overwrite the data being loaded
+        if self.autosave_job is not None:
+            self.root.after_cancel(self.autosave_job)
+            self.autosave_job = None
+        self.unsaved_changes = False
+        
+        # Tasks are shared copy-on-write, settings are copied
         data = {
-            'tasks': self.tasks,
-            'categories': self.categories,
-            'priorities': self.priorities,
-            'colors': self.colors
+            'tasks': self.store.snapshot(),
+            'next_id': self.store.next_id,
+            'categories': list(self.categories),
+            'priorities': list(self.priorities),
+            'colors': dict(self.colors)
         }
         
         try:
-            with open("empress_todo_data.json", 'w') as f:
-                json.dump(data, f, indent=2)
+            self.storage.save_in_background(data)
         except:
             messagebox.showerror("Error", "Failed to save data!")
+            return
+        if self.save_check_job is None:
+            self.check_save_result()
+    
+    def request_autosave(self):
+        """Mark data as unsaved and save it once the autosave window has passed"""
+        self.unsaved_changes = True
+        if self.autosave_job is None and self.data_loaded:
+            self.autosave_job = self.root.after(AUTOSAVE_DELAY_MS, self.autosave)
+    
+    def autosave(self):
+        """Save everything changed during the autosave window"""
+        self.autosave_job = None
+        if self.unsaved_changes:
+            self.save_data()
+    
+    def check_save_result(self):
+        """Report a failed background save once the storage has finished"""
+        self.save_check_job = None
+        if self.storage.take_error() is not None:
+            messagebox.showerror("Error", "Failed to save data!")
+        elif self.storage.is_saving():
+            self.save_check_job = self.root.after(200, self.check_save_result)
     
     # ==============================================
-    # Event Handlers
+    # Performance Instrumentation
     # ==============================================
     
-    def on_task_selected(self, event):
-        """Handle task selection event"""
-        selected = self.get_selected_task()
-        if selected:
-            self.edit_task_btn.config(state=tk.NORMAL)
-            self.delete_task_btn.config(state=tk.NORMAL)
-            self.complete_task_btn.config(state=tk.NORMAL)
-            
-            # Update complete button text based on current state
-            btn_text = "✓ Complete" if not selected['completed'] else "↻ Undo"
-            self.complete_task_btn.config(text=btn_text)
+    def instrument_hot_paths(self):
+        """Replace the view, filter and storage methods with timed versions"""
+        self.profiler = Profiler()
+        for category, names in PROFILED_METHODS.items():
+            self.profiler.instrument(self, names, category)
+        
+        # Writes that storage makes per change or on its worker thread
+        if hasattr(self.storage, 'on_store_changed'):
+            self.profiler.instrument(self.storage, ['on_store_changed'], 'storage', 'storage.')
+        if hasattr(self.storage, 'writer'):
+            self.profiler.instrument(self.storage.writer, ['write'], 'storage', 'storage.')
+    
+    def count_widgets(self):
+        """Count the widgets in the main window"""
+        count, pending = 0, [self.root]
+        while pending:
+            children = pending.pop().winfo_children()
+            count += len(children)
+            pending.extend(children)
+        return count
+    
+    def update_perf_overlay(self):
+        """Show the last and the slowest view refresh and the widget count in the status bar"""
+        self.root.after(PERF_OVERLAY_MS, self.update_perf_overlay)
+        if not self.perf_label.winfo_ismapped():
+            return
+        
+        parts = []
+        last, slowest = self.profiler.last_call('view'), self.profiler.slowest('view')
+        if last:
+            parts.append(f"Last refresh: {last[0]} {last[1] / 1e6:.1f}ms")
+        if slowest:
+            parts.append(f"Slowest: {slowest[0]} {slowest[1] / 1e6:.1f}ms")
+        parts.append(f"Widgets: {self.count_widgets()}")
+        self.perf_label.config(text="⏱ " + " | ".join(parts))
+    
+    def toggle_perf_overlay(self):
+        """Show or hide the performance overlay"""
+        if self.perf_label.winfo_ismapped():
+            self.perf_label.pack_forget()
         else:
-            self.edit_task_btn.config(state=tk.DISABLED)
-            self.delete_task_btn.config(state=tk.DISABLED)
-            self.complete_task_btn.config(state=tk.DISABLED)
+            self.perf_label.pack(side=tk.RIGHT, padx=10)
+            self.update_perf_overlay()
+    
+    def export_trace(self):
+        """Save the recorded calls as a trace file for chrome://tracing or Perfetto"""
+        from tkinter import filedialog
         
+        file_path = filedialog.asksaveasfilename(
+            defaultextension=".json",
+            initialfile="empress_trace.json",
+            filetypes=[("Trace files", "*.json"), ("All files", "*.*")],
+            title="Export performance trace"
+        )
+        if not file_path:
+            return
+        
+        try:
+            count = self.profiler.write_trace(file_path)
+        except OSError as e:
+            messagebox.showerror("Error", f"Failed to export the trace: {e}")
+            return
+        self.show_message(f"⏱ Exported {count} timed calls to {os.path.basename(file_path)}")
+    
+    # ==============================================
+    # Event Handlers
+    # ==============================================
+    
+    def on_task_selected(self, event):
+        """Handle task selection event; the status bar also sets the task buttons"""
         self.update_status_bar()
     
     def on_tab_changed(self, event):
         """Handle notebook tab change event"""
-        current_tab = self.notebook.index(self.notebook.select())
-        if current_tab == 1:  # Board view
-            self.update_board_view()
-        elif current_tab == 2:  # Calendar view
-            self.update_calendar_view()
-        elif current_tab == 3:  # Progress view
-            self.update_progress_view()
+        selected = self.notebook.select()
+        for view, frame in self.view_frames.items():
+            if selected != str(frame):
+                continue
+            if view not in self.built_views:
+                self.view_setups[view]()
+                self.built_views.add(view)
+                self.render_scheduler.invalidate(view)
+            # Hidden tabs were left dirty; repaint the one that just became visible
+            self.render_scheduler.flush(view)
     
     def prev_month(self):
         """Navigate to previous month in calendar"""
         self.current_date = self.current_date.replace(day=1) - timedelta(days=1)
-        self.update_calendar_view()
+        self.show_calendar_month()
     
     def next_month(self):
         """Navigate to next month in calendar"""
         next_month = self.current_date.month % 12 + 1
         next_year = self.current_date.year + (1 if next_month == 1 else 0)
         self.current_date = self.current_date.replace(month=next_month, year=next_year, day=1)
-        self.update_calendar_view()
+        self.show_calendar_month()
     
     def log_activity(self, message):
         """Log activity to the activity log"""
         timestamp = datetime.now().strftime("%Y-%m-%d %H:%M")
         log_message = f"[{timestamp}] {message}\n"
         
+        if 'progress' not in self.built_views:
+            self.activity_backlog.append(log_message)
+            return
+        
         self.activity_log.configure(state='normal')
         self.activity_log.insert(tk.END, log_message)
         self.activity_log.configure(state='disabled')
@@ -1617,7 +2954,12 @@ Features:
     
     def on_closing(self):
         """Handle window closing event"""
-        self.save_data()
+        # Only unsaved changes are handed over; close() waits for the write
+        if self.unsaved_changes:
+            self.save_data()
+        if self.save_check_job is not None:
+            self.root.after_cancel(self.save_check_job)
+        self.storage.close()
         self.root.destroy()
 
 if __name__ == "__main__":